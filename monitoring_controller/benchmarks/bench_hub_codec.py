@@ -0,0 +1,101 @@
+"""
+Micro-benchmark for the SignalR hub codecs on ViewLogExecution frames.
+
+Compares the old split-on-\\x1e + json.loads path, the JsonHubCodec and the
+MessagePackHubCodec. Frames come from a recording (one JSON-protocol frame per
+line, as received from the hub) or are synthesised from a sample log row.
+
+    cd monitoring_controller
+    python -m benchmarks.bench_hub_codec --frames 2000
+    python -m benchmarks.bench_hub_codec --recording recorded_frames.txt
+"""
+import json
+import time
+import argparse
+from scheduler.execution_scheduler.utils.hub_codec import JsonHubCodec, MessagePackHubCodec, RS, _write_varint
+
+SAMPLE_LOG = {
+    "logid": 865257,
+    "ExecutionID": "3NfeEctP",
+    "Time": "11/18/2025 23:57:53:1740 -06:00:00",
+    "Level": "Info",
+    "message": "Process Faulted",
+    "machineName": "DAL-CTX-VRPC003",
+    "userName": "s-fdev3",
+    "processName": "TestLogs",
+    "dateTime": "2025-11-19T05:57:53.2010733",
+}
+
+
+def synthetic_messages(frames, rows):
+    for f in range(frames):
+        data = [
+            {**SAMPLE_LOG, "logid": SAMPLE_LOG["logid"] + f * rows + i, "message": f"Log line {i} of page {f}"}
+            for i in range(rows)
+        ]
+        yield {"type": 1, "target": "viewLogExecution", "arguments": [{"Data": data, "Total": rows}]}
+
+
+def recorded_messages(path):
+    codec = JsonHubCodec()
+    with open(path, encoding="utf-8") as fh:
+        for line in fh:
+            for msg in codec.decode(line.rstrip("\n")):
+                if msg.get("type") == 1 and (msg.get("target") or "").lower() == "viewlogexecution":
+                    yield msg
+
+
+def legacy_decode(raw):
+    return [json.loads(f) for f in raw.split(RS) if f.strip()]
+
+
+def to_msgpack_frame(codec, msg):
+    """Encode a server->client invocation the way the hub would send it."""
+    body = codec._msgpack.packb([1, {}, None, msg["target"], msg["arguments"], []], use_bin_type=True)
+    return _write_varint(len(body)) + body
+
+
+def run(name, decode, frames):
+    wall, cpu = time.perf_counter(), time.process_time()
+    count = 0
+    for raw in frames:
+        for _ in decode(raw):
+            count += 1
+    wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+    size = sum(len(f) for f in frames)
+    print(
+        f"{name:<14} {len(frames) / wall:>12,.0f} frames/s "
+        f"{cpu / len(frames) * 1e6:>10.1f} µs CPU/frame "
+        f"{size / len(frames):>10,.0f} bytes/frame"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--recording", help="file with one recorded JSON-protocol frame per line")
+    parser.add_argument("--frames", type=int, default=2000, help="synthetic frames to generate")
+    parser.add_argument("--rows", type=int, default=50, help="log rows per synthetic frame")
+    args = parser.parse_args()
+
+    messages = list(recorded_messages(args.recording) if args.recording else synthetic_messages(args.frames, args.rows))
+    if not messages:
+        raise SystemExit("No ViewLogExecution frames to benchmark")
+
+    json_frames = [json.dumps(m) + RS for m in messages]
+    print(f"{len(messages)} ViewLogExecution frames\n")
+
+    run("legacy-json", legacy_decode, json_frames)
+    run("json", JsonHubCodec().decode, json_frames)
+
+    try:
+        mp = MessagePackHubCodec()
+    except ImportError:
+        print("messagepack     skipped (pip install msgpack)")
+        return
+    mp._handshake_done = True
+    mp_frames = [to_msgpack_frame(mp, m) for m in messages]
+    run("messagepack", mp.decode, mp_frames)
+
+
+if __name__ == "__main__":
+    main()
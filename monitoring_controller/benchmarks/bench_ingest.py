@@ -0,0 +1,155 @@
+"""
+End-to-end ingest benchmark against the local fake hub and a local mongod.
+
+Starts benchmarks.fake_hub in-process (or uses --hub-url for one already
+running), points the controller at it and at a scratch database, runs the
+real supervisor / ws client / ingest writers for --duration seconds and
+reports:
+
+  * frames/sec      hub frames handed to the ingest pipeline
+  * Mongo latency   average and last bulk_write latency per writer
+  * end-to-end lag  log dateTime (stamped by the fake hub) -> row flushed
+
+    cd monitoring_controller
+    python -m benchmarks.bench_ingest --duration 60 --executions 200 --growth 200
+    python -m benchmarks.bench_ingest --rate 500 --recording recorded_frames.txt
+
+The scratch database (--database, default ingest_bench) is dropped first.
+"""
+import os
+import sys
+import time
+import asyncio
+from datetime import datetime
+from benchmarks import fake_hub
+
+
+def build_parser():
+    parser = fake_hub.build_parser()
+    parser.description = __doc__
+    parser.add_argument("--duration", type=float, default=60)
+    parser.add_argument("--mongo-uri", default="mongodb://localhost:27017")
+    parser.add_argument("--database", default="ingest_bench")
+    parser.add_argument("--hub-url", help="use an already running fake hub (http://host:port)")
+    parser.add_argument("--poll-interval", type=float, default=5, help="EXECUTION_POLL_INTERVAL for the run")
+    return parser
+
+
+def configure(args):
+    """The controller reads its config at import time, so set it before importing."""
+    base = args.hub_url or f"http://{args.host}:{args.port}"
+    os.environ.update({
+        "HUB_API_URL": base,
+        "HUB_URL": base.replace("http", "ws", 1) + "/myhub",
+        "HUB_USER": "bench",
+        "HUB_PASSWORD": "bench",
+        "MONGO_URI": args.mongo_uri,
+        "DATABASE_NAME": args.database,
+        "EXECUTION_POLL_INTERVAL": str(args.poll_interval),
+    })
+
+
+class LagProbe:
+    """Wraps a writer's on_flush hook to measure dateTime -> flushed lag."""
+
+    def __init__(self, writer):
+        self.inner = writer.on_flush
+        self.samples = []
+        writer.on_flush = self
+
+    async def __call__(self, batch):
+        now = datetime.now()
+        for row in batch:
+            try:
+                self.samples.append((now - datetime.fromisoformat(row["dateTime"])).total_seconds())
+            except (KeyError, TypeError, ValueError):
+                continue
+        if self.inner:
+            await self.inner(batch)
+
+    def summary(self):
+        if not self.samples:
+            return {"rows": 0}
+        ordered = sorted(self.samples)
+        return {
+            "rows": len(ordered),
+            "avg_s": round(sum(ordered) / len(ordered), 3),
+            "p50_s": round(ordered[len(ordered) // 2], 3),
+            "p95_s": round(ordered[int(len(ordered) * 0.95)], 3),
+            "max_s": round(ordered[-1], 3),
+        }
+
+
+def writer_summary(writer):
+    stats = writer.stats
+    return {
+        "rows": stats["rows"],
+        "batches": stats["batches"],
+        "avg_batch_latency_ms": round(stats["total_latency_ms"] / stats["batches"], 2) if stats["batches"] else 0.0,
+        "last_batch_latency_ms": stats["last_batch_latency_ms"],
+        "errors": stats["errors"],
+    }
+
+
+async def run(args):
+    from db_connection.database import client, ensure_collections
+    from db_connection.log_store import ensure_log_storage
+    from scheduler.execution_scheduler.supervisor import hub_supervisor
+    from scheduler.execution_scheduler.ingest_queue import ingest_pipeline
+    from scheduler.execution_scheduler.ingest_writer import execution_writer, log_writer
+    from scheduler.execution_scheduler.execution_cache import execution_cache
+    from scheduler.execution_scheduler.execution_poller import execution_poller
+    from scheduler.execution_scheduler.utils.apis import auth_manager
+
+    hub = None
+    if not args.hub_url:
+        hub, _ = await fake_hub.serve(args)
+
+    await client.drop_database(args.database)
+    await ensure_collections()
+    await ensure_log_storage()
+    await execution_cache.load()
+    await execution_poller.load()
+
+    probe = LagProbe(log_writer)
+    tasks = [
+        asyncio.create_task(execution_writer.run()),
+        asyncio.create_task(log_writer.run()),
+        asyncio.create_task(hub_supervisor.run()),
+    ]
+
+    started = time.monotonic()
+    await asyncio.sleep(args.duration)
+    elapsed = time.monotonic() - started
+
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    await execution_writer.flush()
+    await log_writer.flush()
+    await auth_manager.close()
+
+    frames = ingest_pipeline.stats["enqueued"]
+    print(f"\n📊 Ingest benchmark ({elapsed:.0f}s)")
+    print(f"  frames:          {frames} ({frames / elapsed:.1f} frames/s, {ingest_pipeline.stats['failed']} failed)")
+    if hub:
+        print(f"  hub frames sent: {hub.stats['frames_sent']} ({hub.stats['frames_sent'] / elapsed:.1f} frames/s)")
+    print(f"  executions:      {writer_summary(execution_writer)}")
+    print(f"  logs:            {writer_summary(log_writer)}")
+    print(f"  log rows/s:      {log_writer.stats['rows'] / elapsed:.1f}")
+    print(f"  end-to-end lag:  {probe.summary()}")
+    print(f"  queue:           max enqueue wait {ingest_pipeline.stats['enqueue_wait_ms_max']:.1f} ms, "
+          f"{ingest_pipeline.stats['fetch_pauses']} fetch pauses")
+
+
+def main():
+    args = build_parser().parse_args()
+    configure(args)
+    try:
+        asyncio.run(run(args))
+    except KeyboardInterrupt:
+        sys.exit(130)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,230 @@
+"""
+Local stand-in for the governor SignalR hub, for exercising the ingest path
+without the live tenant.
+
+Serves the login and negotiate endpoints and a /myhub WebSocket that speaks
+the SignalR JSON protocol with the ViewExecution, ViewLogExecution,
+RunProcessExecution (plus ViewNoPageProcess / ViewRobot /
+ViewNoPageXamlPackageVersion for the restart flow) targets.
+
+Data is synthetic by default: a set of executions whose running ones keep
+producing log lines at --growth rows/sec. With --recording, the recorded
+JSON-protocol frames (one per line) are replayed to every connection instead.
+Every pushed frame goes through a --rate frames/sec limiter.
+
+    cd monitoring_controller
+    python -m benchmarks.fake_hub --port 8765 --executions 200 --logs-per-execution 500
+
+Point the controller at it with
+    HUB_URL=ws://localhost:8765/myhub HUB_API_URL=http://localhost:8765
+"""
+import json
+import time
+import uuid
+import base64
+import random
+import asyncio
+import argparse
+from datetime import datetime
+from aiohttp import web, WSMsgType
+
+RS = "\x1e"
+STATES = ["Running", "Running", "Successful", "Faulted"]
+
+
+def fake_jwt(lifetime: int) -> str:
+    def b64(obj):
+        return base64.urlsafe_b64encode(json.dumps(obj).encode()).decode().rstrip("=")
+    now = int(time.time())
+    return f"{b64({'alg': 'none'})}.{b64({'id': 'bench', 'iat': now, 'exp': now + lifetime})}.sig"
+
+
+class FakeHubData:
+    """Synthetic executions and their (newest-first) log lines."""
+
+    def __init__(self, executions: int, logs_per_execution: int, growth: float):
+        self.growth = growth
+        self.executions = []
+        self.logs = {}
+        self._next_logid = 1
+        for i in range(executions):
+            exec_id = uuid.uuid4().hex[:8]
+            self.executions.append({
+                "Id": i + 1,
+                "ExecutionId": exec_id,
+                "Process": f"BenchProcess{i % 10}",
+                "Robot": f"BenchRobot{i % 5}",
+                "EntryFile": "Main.xaml",
+                "Arguments": None,
+                "ToBeAborted": False,
+                "Environment": "Bench",
+                "State": random.choice(STATES),
+                "StartTime": datetime.now().isoformat(),
+                "EndTime": None,
+                "Source": "Bench",
+                "Tenant": "default",
+                "TenantId": 1,
+            })
+            self.logs[exec_id] = []
+            for _ in range(logs_per_execution):
+                self._add_log(exec_id)
+        # Newest first, like the hub's execution grid
+        self.executions.reverse()
+
+    def _add_log(self, exec_id, level="Info"):
+        now = datetime.now()
+        self.logs[exec_id].insert(0, {
+            "logid": self._next_logid,
+            "ExecutionID": exec_id,
+            "Time": now.strftime("%m/%d/%Y %H:%M:%S:%f"),
+            "Level": level,
+            "message": f"Bench log line {self._next_logid}",
+            "machineName": "BENCH-HOST",
+            "userName": "bench",
+            "processName": "BenchProcess",
+            "dateTime": now.isoformat(),
+        })
+        self._next_logid += 1
+
+    async def grow(self):
+        """Keep running executions producing logs at `growth` rows/sec in total."""
+        if self.growth <= 0:
+            return
+        while True:
+            await asyncio.sleep(1 / self.growth)
+            running = [e for e in self.executions if e["State"] == "Running"]
+            if running:
+                self._add_log(random.choice(running)["ExecutionId"])
+
+    def execution_page(self, page, size):
+        return self.executions[page * size:(page + 1) * size]
+
+    def log_page(self, exec_id, page, size):
+        return self.logs.get(exec_id, [])[page * size:(page + 1) * size]
+
+
+class FakeHub:
+    def __init__(self, data: FakeHubData, rate: float, recording=None, token_lifetime: int = 3600):
+        self.data = data
+        self.rate = rate
+        self.recording = recording
+        self.token_lifetime = token_lifetime
+        self.stats = {"connections": 0, "frames_sent": 0, "invocations": 0}
+
+    def app(self):
+        app = web.Application()
+        app.router.add_post("/api/login", self.login)
+        app.router.add_post("/myhub/negotiate", self.negotiate)
+        app.router.add_get("/myhub", self.hub)
+        return app
+
+    async def login(self, request):
+        return web.json_response({"token": fake_jwt(self.token_lifetime)})
+
+    async def negotiate(self, request):
+        return web.json_response({"connectionToken": uuid.uuid4().hex, "negotiateVersion": 1})
+
+    async def hub(self, request):
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        self.stats["connections"] += 1
+        send_lock = asyncio.Lock()
+        interval = 1 / self.rate if self.rate > 0 else 0
+
+        async def send(msg, limited=True):
+            async with send_lock:
+                if limited and interval:
+                    await asyncio.sleep(interval)
+                await ws.send_str(json.dumps(msg) + RS)
+                self.stats["frames_sent"] += 1
+
+        replay = None
+        handshake_done = False
+        async for frame in ws:
+            if frame.type != WSMsgType.TEXT:
+                continue
+            for record in (r for r in frame.data.split(RS) if r.strip()):
+                msg = json.loads(record)
+                if not handshake_done:
+                    handshake_done = True
+                    await ws.send_str("{}" + RS)
+                    if self.recording:
+                        replay = asyncio.create_task(self._replay(send))
+                    continue
+                if msg.get("type") == 1:
+                    self.stats["invocations"] += 1
+                    asyncio.create_task(self._invoke(send, msg))
+        if replay:
+            replay.cancel()
+        return ws
+
+    async def _replay(self, send):
+        with open(self.recording, encoding="utf-8") as fh:
+            frames = [json.loads(r) for line in fh for r in line.split(RS) if r.strip()]
+        for msg in frames:
+            if msg.get("type") == 1:
+                await send(msg)
+
+    async def _invoke(self, send, msg):
+        target, args, inv = msg["target"], msg.get("arguments", []), msg.get("invocationId")
+        result = True
+
+        if target == "ViewExecution":
+            page, size = args[0], args[1]
+            await send({"type": 1, "target": "viewExecution", "arguments": [
+                {"Data": self.data.execution_page(page, size), "Total": len(self.data.executions)}
+            ]})
+        elif target == "ViewLogExecution":
+            exec_id, page, size = args[0], args[1], args[2]
+            await send({"type": 1, "target": "viewLogExecution", "arguments": [
+                {"Data": self.data.log_page(exec_id, page, size)}
+            ]})
+        elif target == "ViewNoPageProcess":
+            result = [{"Id": i, "Name": f"BenchProcess{i}"} for i in range(10)]
+        elif target == "ViewNoPageXamlPackageVersion":
+            result = {"listOfFiles": [{"Name": "Main.xaml"}]}
+        elif target == "ViewRobot":
+            page, size = args[0], args[1]
+            robots = [{"RobotName": f"BenchRobot{i}", "ClientId": i} for i in range(5)]
+            await send({"type": 1, "target": "viewRobot", "arguments": [
+                {"Data": robots[page * size:(page + 1) * size]}
+            ]})
+        elif target == "RunProcessExecution":
+            result = True
+
+        if inv is not None:
+            await send({"type": 3, "invocationId": inv, "result": result}, limited=False)
+
+
+async def serve(args):
+    data = FakeHubData(args.executions, args.logs_per_execution, args.growth)
+    hub = FakeHub(data, args.rate, args.recording, args.token_lifetime)
+    runner = web.AppRunner(hub.app())
+    await runner.setup()
+    await web.TCPSite(runner, args.host, args.port).start()
+    print(f"✔ Fake hub on http://{args.host}:{args.port} "
+          f"({len(data.executions)} executions, rate={args.rate or 'unlimited'} frames/s)")
+    asyncio.create_task(data.grow())
+    return hub, runner
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--executions", type=int, default=200)
+    parser.add_argument("--logs-per-execution", type=int, default=500)
+    parser.add_argument("--growth", type=float, default=50, help="new log rows/sec across running executions")
+    parser.add_argument("--rate", type=float, default=0, help="max pushed frames/sec per connection (0 = unlimited)")
+    parser.add_argument("--recording", help="replay recorded JSON-protocol frames instead of synthetic pushes")
+    parser.add_argument("--token-lifetime", type=int, default=3600, help="JWT lifetime in seconds")
+    return parser
+
+
+async def main():
+    await serve(build_parser().parse_args())
+    await asyncio.Event().wait()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,139 @@
+import os
+import time
+import asyncio
+import logging
+from datetime import datetime, timezone
+from pymongo.errors import BulkWriteError, OperationFailure
+from db_connection.database import db, load_state, save_state, NO_REPLICA_SET_CODE, RESUME_FAILED_CODES
+
+logger = logging.getLogger(__name__)
+
+# -------------------------------
+# Config
+# -------------------------------
+AUDIT_BATCH_SIZE = int(os.getenv("AUDIT_BATCH_SIZE", 200))
+AUDIT_FLUSH_INTERVAL = float(os.getenv("AUDIT_FLUSH_INTERVAL", 2.0))
+AUDIT_RESUME_TOKEN_KEY = "jobs_audit_resume_token"
+# Updates touching only these fields (lease claims, heartbeats and releases) are not audited
+AUDIT_IGNORED_FIELDS = {"is_running", "lease_owner", "lease_expires", "UpdatedAt"}
+
+
+class JobAuditWriter:
+    """
+    Audit trail of `jobs` changes from a change stream.
+
+    Events are buffered and written with one insert_many when AUDIT_BATCH_SIZE
+    entries are waiting or AUDIT_FLUSH_INTERVAL seconds have passed. Updates
+    store only their delta (updatedFields / removedFields), never the full
+    document. The resume token is saved after every flush; each entry carries
+    its change event id under a unique index, so events replayed after a crash
+    are not written twice.
+    """
+
+    def __init__(self, collection, audit_collection):
+        self.collection = collection
+        self.audit_collection = audit_collection
+        self._buffer = []
+        self._last_flush = time.monotonic()
+        self._saved_token = None
+        self.stats = {"events": 0, "skipped": 0, "written": 0, "duplicates": 0, "batches": 0, "errors": 0}
+
+    def to_entry(self, change):
+        """Audit entry for a change event, or None for events not worth keeping."""
+        op = change["operationType"]
+        job_id = change.get("documentKey", {}).get("_id")
+        entry = {
+            "event_id": change["_id"]["_data"],
+            "jobType": "change",
+            "jobId": str(job_id) if job_id is not None else None,
+            "actor": "system",
+            "timestamp": change.get("wallTime") or datetime.now(timezone.utc),
+            "operation_type": op,
+            "document_key": change.get("documentKey"),
+        }
+        if op == "update":
+            desc = change.get("updateDescription", {})
+            updated = desc.get("updatedFields", {})
+            removed = desc.get("removedFields", [])
+            fields = set(updated) | set(removed)
+            if not fields - AUDIT_IGNORED_FIELDS:
+                return None
+            entry["update_description"] = {"updatedFields": updated, "removedFields": removed}
+            entry["message"] = f"update: {', '.join(sorted(fields - AUDIT_IGNORED_FIELDS))}"
+        elif op in ("insert", "replace"):
+            # The inserted document is the change itself
+            entry["update_description"] = {"updatedFields": change.get("fullDocument", {}), "removedFields": []}
+            entry["message"] = f"{op}: job created" if op == "insert" else f"{op}: job replaced"
+        else:
+            entry["message"] = op
+        return entry
+
+    async def flush(self, resume_token):
+        batch, self._buffer = self._buffer, []
+        self._last_flush = time.monotonic()
+        if batch:
+            try:
+                result = await self.audit_collection.insert_many(batch, ordered=False)
+                self.stats["written"] += len(result.inserted_ids)
+            except BulkWriteError as e:
+                errors = e.details.get("writeErrors", [])
+                duplicates = sum(1 for err in errors if err.get("code") == 11000)
+                self.stats["written"] += e.details.get("nInserted", 0)
+                self.stats["duplicates"] += duplicates
+                if duplicates < len(errors):
+                    self.stats["errors"] += len(errors) - duplicates
+                    logger.error(f"⚠ Audit write errors: {[err for err in errors if err.get('code') != 11000]}")
+            self.stats["batches"] += 1
+            logger.info(f"📝 Audited {len(batch)} job changes")
+        if resume_token is not None and resume_token != self._saved_token:
+            await save_state(AUDIT_RESUME_TOKEN_KEY, resume_token)
+            self._saved_token = resume_token
+
+    def _due(self) -> bool:
+        # On the timer even when empty, so skipped events still advance the saved token
+        return (len(self._buffer) >= AUDIT_BATCH_SIZE
+                or time.monotonic() - self._last_flush >= AUDIT_FLUSH_INTERVAL)
+
+    async def run(self):
+        while True:
+            resume_token = self._saved_token = await load_state(AUDIT_RESUME_TOKEN_KEY)
+            try:
+                async with self.collection.watch(
+                    resume_after=resume_token, max_await_time_ms=int(AUDIT_FLUSH_INTERVAL * 1000)
+                ) as stream:
+                    logger.info(f"👀 Auditing job changes (resumed={resume_token is not None})")
+                    while stream.alive:
+                        change = await stream.try_next()
+                        if change is not None:
+                            self.stats["events"] += 1
+                            entry = self.to_entry(change)
+                            if entry is None:
+                                self.stats["skipped"] += 1
+                            else:
+                                self._buffer.append(entry)
+                        if self._due():
+                            await self.flush(stream.resume_token)
+            except asyncio.CancelledError:
+                raise
+            except OperationFailure as e:
+                if e.code == NO_REPLICA_SET_CODE:
+                    logger.warning("⚠ Change streams need a replica set, job changes will not be audited")
+                    return
+                if e.code in RESUME_FAILED_CODES:
+                    logger.warning(f"⚠ Audit resume token expired ({e.code}), starting from now")
+                    self._buffer = []
+                    await save_state(AUDIT_RESUME_TOKEN_KEY, None)
+                    continue
+                logger.error(f"⚠ Error in job audit stream: {e}", exc_info=True)
+            except Exception as e:
+                logger.error(f"⚠ Error in job audit stream: {e}", exc_info=True)
+            # Unflushed events are re-read from the last saved token
+            self._buffer = []
+            await asyncio.sleep(5)
+
+
+job_audit_writer = JobAuditWriter(db.jobs, db.auditlogs)
+
+
+async def watch_jobs_changes():
+    await job_audit_writer.run()
@@ -1,16 +1,69 @@
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from pymongo.errors import OperationFailure
 from datetime import datetime,timezone
-import asyncio
+import os
+from dotenv import load_dotenv
+load_dotenv()
 
-MONGO_URI = "mongodb://10.0.0.239:27017"
+MONGO_URI = os.getenv("MONGO_URI", "mongodb://10.0.0.239:27017")
 # MONGO_URI = "mongodb://localhost:27017"
-DATABASE_NAME = "automation_logs_db"
+DATABASE_NAME = os.getenv("DATABASE_NAME", "automation_logs_db")
 
 client = AsyncIOMotorClient(MONGO_URI)
 db = client[DATABASE_NAME]
 
 # Required collections
-REQUIRED_COLLECTIONS = ["jobs", "executions", "logs", "rca", "auditlogs"]
+REQUIRED_COLLECTIONS = ["jobs", "executions", "logs", "rca", "auditlogs", "log_watermarks", "ingest_state", "backfill_jobs", "dispatch_dead_letters"]
+
+# IndexOptionsConflict, IndexKeySpecsConflict
+INDEX_CONFLICT_CODES = {85, 86}
+# Change streams on a standalone mongod (no replica set)
+NO_REPLICA_SET_CODE = 40573
+# Resume token no longer usable: ChangeStreamFatalError, InvalidResumeToken, ChangeStreamHistoryLost
+RESUME_FAILED_CODES = {280, 260, 286}
+
+# Indexes for the hot queries, applied idempotently by ensure_collections.
+# Unique where the writers upsert on the key.
+INDEXES = {
+    "executions": [
+        IndexModel([("ExecutionId", ASCENDING)], unique=True),
+        IndexModel([("State", ASCENDING), ("IngestedAt", ASCENDING)]),
+        # Backfill planning by time range
+        IndexModel([("StartTime", ASCENDING)]),
+    ],
+    "logs": [
+        IndexModel([("logid", ASCENDING)], unique=True),
+        IndexModel([("ExecutionID", ASCENDING), ("logid", ASCENDING)]),
+    ],
+    "jobs": [
+        # Partial, so jobs created without an ExecutionId do not collide on null
+        IndexModel([("ExecutionId", ASCENDING)], unique=True,
+                   partialFilterExpression={"ExecutionId": {"$type": "string"}}),
+        IndexModel([("status", ASCENDING)]),
+        IndexModel([("lease_expires", ASCENDING)]),
+        IndexModel([("threadId", ASCENDING)]),
+        IndexModel([("CreatedAt", DESCENDING), ("_id", DESCENDING)]),
+    ],
+    "rca": [
+        IndexModel([("RCA_ID", ASCENDING)]),
+    ],
+    "auditlogs": [
+        IndexModel([("jobId", ASCENDING), ("timestamp", DESCENDING)]),
+        IndexModel([("timestamp", DESCENDING), ("_id", DESCENDING)]),
+        # Change events written by the job audit writer, for idempotent replays
+        IndexModel([("event_id", ASCENDING)], unique=True, sparse=True),
+    ],
+    "log_watermarks": [
+        IndexModel([("ExecutionId", ASCENDING)], unique=True),
+    ],
+    "backfill_jobs": [
+        IndexModel([("status", ASCENDING)]),
+    ],
+    "dispatch_dead_letters": [
+        IndexModel([("jobId", ASCENDING)]),
+    ],
+}
 
 async def ensure_collections():
     existing_collections = await db.list_collection_names()
@@ -20,26 +73,82 @@ async def ensure_collections():
             await db.create_collection(col)
         else:
             print(f"✔ Collection '{col}' already exists.")
+    await ensure_indexes()
+
+
+async def ensure_indexes():
+    """Create every index in INDEXES; existing identical indexes are a no-op."""
+    for col, models in INDEXES.items():
+        for model in models:
+            spec = model.document
+            try:
+                await db[col].create_indexes([model])
+            except OperationFailure as e:
+                if e.code in INDEX_CONFLICT_CODES:
+                    await rebuild_index(col, model)
+                elif spec.get("unique") and e.code == 11000:
+                    await create_fallback_index(col, model)
+                else:
+                    print(f"⚠ Could not create index {spec['name']} on '{col}': {e}")
+                continue
+            print(f"✔ Index '{col}.{spec['name']}' ready.")
+
+
+async def create_fallback_index(col, model):
+    # Duplicates from before the index existed: keep the lookup fast, and
+    # enforce uniqueness once the data is cleaned up and this index dropped
+    spec = model.document
+    print(f"⚠ Duplicate keys in '{col}', creating non-unique index {spec['name']}_nonunique")
+    await db[col].create_index(list(spec["key"].items()), name=f"{spec['name']}_nonunique")
+
+
+async def rebuild_index(col, model):
+    """Replace an index whose options changed (e.g. it is now unique)."""
+    spec = model.document
+    key = list(spec["key"].items())
+    existing = await db[col].index_information()
+    for name, info in existing.items():
+        if info["key"] != key and name != spec["name"]:
+            continue
+        if name.endswith("_nonunique"):
+            if await has_duplicates(col, spec):
+                print(f"⚠ '{col}' still uses {name}; drop it once duplicates are removed")
+                return
+            print(f"⚡ Duplicates in '{col}' are gone, replacing {name} with {spec['name']}")
+        print(f"⚡ Index {name} on '{col}' changed, rebuilding it...")
+        await db[col].drop_index(name)
+    try:
+        await db[col].create_indexes([model])
+        print(f"✔ Index '{col}.{spec['name']}' ready.")
+    except OperationFailure as e:
+        if spec.get("unique") and e.code == 11000:
+            await create_fallback_index(col, model)
+        else:
+            print(f"⚠ Could not create index {spec['name']} on '{col}': {e}")
+
+
+async def has_duplicates(col, spec) -> bool:
+    """Whether any key of a unique index spec (within its partial filter) occurs twice."""
+    key = {field.replace(".", "_"): f"${field}" for field in spec["key"]}
+    pipeline = [
+        {"$match": spec.get("partialFilterExpression", {})},
+        {"$group": {"_id": key, "count": {"$sum": 1}}},
+        {"$match": {"count": {"$gt": 1}}},
+        {"$limit": 1},
+    ]
+    return bool(await db[col].aggregate(pipeline).to_list(1))
+
+
+async def load_state(key: str, default=None):
+    """Read a small piece of scheduler state (cursors, resume tokens) by key."""
+    doc = await db.ingest_state.find_one({"_id": key})
+    return doc["value"] if doc else default
+
 
+async def save_state(key: str, value):
+    await db.ingest_state.update_one(
+        {"_id": key},
+        {"$set": {"value": value, "UpdatedAt": datetime.now(timezone.utc)}},
+        upsert=True
+    )
 
-async def watch_jobs_changes():
-    while True:
-        try:
-            collection = db.jobs
-            audit_collection = db.auditlogs
-            async with collection.watch() as change_stream:
-                async for change in change_stream:
-                    log_entry = {
-                        "timestamp": datetime.now(timezone.utc),
-                        "operation_type": change.get("operationType"),
-                        "document_key": change.get("documentKey"),
-                        "full_document": change.get("fullDocument"),
-                        "update_description": change.get("updateDescription"),
-                    }
-                    await audit_collection.insert_one(log_entry)
-                    print("✅ Logged change:", log_entry)
-        except Exception as e:
-            print("⚠ Error in watch_jobs_changes:", e)
-            await asyncio.sleep(5)  # Retry after 5 seconds
-            
-            
\ No newline at end of file
@@ -0,0 +1,89 @@
+"""
+Query-plan check for the hot Mongo queries.
+
+Runs explain() on every query in HOT_QUERIES and exits non-zero if any
+winning plan contains a COLLSCAN stage.
+
+    cd monitoring_controller
+    python -m db_connection.diagnostics
+    python -m db_connection.diagnostics --ensure   # apply INDEXES first
+"""
+import sys
+import asyncio
+import argparse
+from datetime import datetime
+from db_connection.database import db, ensure_indexes
+from db_connection.log_store import LOG_STORAGE, LOG_TIMESERIES_COLLECTION, ensure_log_storage
+
+# (name, collection, filter, sort); filter values are placeholders, the plan
+# depends only on the shape of the query
+HOT_QUERIES = [
+    ("execution by ExecutionId", "executions", {"ExecutionId": "x"}, None),
+    ("executions by State", "executions", {"State": "Faulted"}, None),
+    ("faulted since watermark", "executions", {"State": "Faulted", "IngestedAt": {"$gte": datetime(2000, 1, 1)}}, None),
+    ("log by logid", "logs", {"logid": 1}, None),
+    ("logs by ExecutionID", "logs", {"ExecutionID": "x"}, None),
+    ("job by ExecutionId", "jobs", {"ExecutionId": "x"}, None),
+    ("job by threadId", "jobs", {"threadId": "x"}, None),
+    ("actionable jobs", "jobs", {"status": {"$nin": ["Completed", "Started"]}}, None),
+    ("jobs newest first", "jobs", {}, [("CreatedAt", -1)]),
+    ("rca by RCA_ID", "rca", {"RCA_ID": "x"}, None),
+    ("auditlogs by jobId", "auditlogs", {"jobId": "x"}, [("timestamp", -1)]),
+    ("running backfills", "backfill_jobs", {"status": "running"}, None),
+]
+if LOG_STORAGE == "timeseries":
+    HOT_QUERIES += [
+        ("time-series logs by ExecutionID", LOG_TIMESERIES_COLLECTION, {"meta.ExecutionID": "x"}, None),
+        ("time-series log by logid", LOG_TIMESERIES_COLLECTION, {"logid": 1}, None),
+    ]
+
+
+def plan_stages(plan):
+    """Yield every stage name in an explain() plan tree."""
+    if isinstance(plan, dict):
+        if "stage" in plan:
+            yield plan["stage"]
+        for value in plan.values():
+            yield from plan_stages(value)
+    elif isinstance(plan, list):
+        for item in plan:
+            yield from plan_stages(item)
+
+
+async def explain_query(collection, query, sort):
+    cursor = db[collection].find(query)
+    if sort:
+        cursor = cursor.sort(sort)
+    explain = await cursor.explain()
+    winning_plan = explain["queryPlanner"]["winningPlan"]
+    return list(plan_stages(winning_plan))
+
+
+async def run_diagnostics() -> bool:
+    ok = True
+    for name, collection, query, sort in HOT_QUERIES:
+        stages = await explain_query(collection, query, sort)
+        if "COLLSCAN" in stages:
+            ok = False
+            print(f"❌ {name} ({collection}): COLLSCAN  [{' > '.join(stages)}]")
+        else:
+            print(f"✔ {name} ({collection}): {' > '.join(stages)}")
+    return ok
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--ensure", action="store_true", help="create missing indexes before checking")
+    args = parser.parse_args()
+
+    if args.ensure:
+        await ensure_indexes()
+        await ensure_log_storage()
+    ok = await run_diagnostics()
+    if not ok:
+        print("⚠ Some hot queries fall back to a collection scan")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,164 @@
+import os
+import json
+import asyncio
+import logging
+from pymongo.errors import OperationFailure
+from db_connection.database import db, NO_REPLICA_SET_CODE
+from utils.pagination import convert_ids, to_json
+
+logger = logging.getLogger(__name__)
+
+# -------------------------------
+# Config
+# -------------------------------
+# Frames buffered per subscriber before it is dropped as too slow
+LIVE_QUEUE_SIZE = int(os.getenv("LIVE_QUEUE_SIZE", 1000))
+LIVE_SNAPSHOT_LIMIT = int(os.getenv("LIVE_SNAPSHOT_LIMIT", 2000))
+# Seconds between shared snapshots when change streams are unavailable (standalone mongod)
+LIVE_POLL_INTERVAL = float(os.getenv("LIVE_POLL_INTERVAL", 60))
+# Collection -> kind sent to the dashboard
+LIVE_COLLECTIONS = {"jobs": "job", "executions": "execution", "auditlogs": "audit"}
+# Fields the dashboard shows; everything else is left out of the deltas
+EXECUTION_FIELDS = ("ExecutionId", "Process", "Robot", "EntryFile", "State")
+AUDIT_FIELDS = ("jobId", "jobType", "actor", "message", "timestamp")
+# Updates touching only these fields (lease heartbeats, ingest stamps) are not pushed
+LIVE_IGNORED_FIELDS = {"lease_expires", "UpdatedAt", "IngestedAt"}
+
+LIVE_PIPELINE = [{"$match": {
+    "ns.coll": {"$in": list(LIVE_COLLECTIONS)},
+    "operationType": {"$in": ["insert", "update", "replace", "delete"]},
+}}]
+
+
+def sse_frame(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=to_json)}\n\n"
+
+
+def pick(doc: dict, fields) -> dict:
+    return {k: doc[k] for k in fields if k in doc}
+
+
+class LiveFeed:
+    """
+    Job, execution and audit deltas for the dashboard.
+
+    A single database change stream feeds every subscriber: each event is
+    encoded once and put on the subscribers' queues, so adding a dashboard
+    adds no database work. A subscriber that falls LIVE_QUEUE_SIZE frames
+    behind is dropped; its page reconnects and starts from a fresh snapshot.
+
+    Without a replica set there is no change stream. The feed then stops
+    retrying and pushes one shared snapshot every LIVE_POLL_INTERVAL seconds
+    instead, however many dashboards are open.
+    """
+
+    def __init__(self, database):
+        self.db = database
+        self._subscribers = set()
+        self.mode = "stream"
+        self.stats = {"events": 0, "skipped": 0, "published": 0, "dropped_subscribers": 0, "restarts": 0, "polls": 0}
+
+    def subscribe(self) -> asyncio.Queue:
+        queue = asyncio.Queue(maxsize=LIVE_QUEUE_SIZE)
+        self._subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue):
+        self._subscribers.discard(queue)
+
+    def publish(self, frame: str):
+        for queue in list(self._subscribers):
+            try:
+                queue.put_nowait(frame)
+            except asyncio.QueueFull:
+                # Make room for the end-of-stream marker and let the page resync
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(None)
+                self._subscribers.discard(queue)
+                self.stats["dropped_subscribers"] += 1
+        self.stats["published"] += 1
+
+    async def load_snapshot(self) -> dict:
+        """Latest jobs plus the execution details the dashboard shows for them."""
+        jobs = await self.db.jobs.find().sort([("CreatedAt", -1), ("_id", -1)]).to_list(LIVE_SNAPSHOT_LIMIT)
+        exec_ids = list({j["ExecutionId"] for j in jobs if j.get("ExecutionId")})
+        projection = {field: 1 for field in EXECUTION_FIELDS}
+        executions = await self.db.executions.find({"ExecutionId": {"$in": exec_ids}}, projection).to_list(None)
+        return {"jobs": [convert_ids(j) for j in jobs], "executions": [convert_ids(e) for e in executions]}
+
+    def to_delta(self, change):
+        """Delta for a change event, or None when the dashboard would not change."""
+        kind = LIVE_COLLECTIONS[change["ns"]["coll"]]
+        op = change["operationType"]
+        delta = {"kind": kind, "op": op, "id": str(change["documentKey"]["_id"])}
+
+        if op in ("insert", "replace"):
+            doc = change.get("fullDocument") or {}
+            if kind == "execution":
+                doc = {"_id": doc.get("_id"), **pick(doc, EXECUTION_FIELDS)}
+            elif kind == "audit":
+                doc = {"_id": doc.get("_id"), **pick(doc, AUDIT_FIELDS)}
+            delta["doc"] = doc
+        elif op == "update":
+            if kind == "audit":
+                return None
+            desc = change.get("updateDescription", {})
+            updated = desc.get("updatedFields", {})
+            removed = desc.get("removedFields", [])
+            if kind == "execution":
+                updated = pick(updated, EXECUTION_FIELDS)
+                removed = [f for f in removed if f in EXECUTION_FIELDS]
+            if not (set(updated) | set(removed)) - LIVE_IGNORED_FIELDS:
+                return None
+            delta["set"] = updated
+            delta["unset"] = removed
+        return delta
+
+    async def run(self):
+        while True:
+            try:
+                async with self.db.watch(LIVE_PIPELINE) as stream:
+                    logger.info(f"📡 Live feed streaming {', '.join(LIVE_COLLECTIONS)} changes")
+                    async for change in stream:
+                        self.stats["events"] += 1
+                        delta = self.to_delta(change)
+                        if delta is None:
+                            self.stats["skipped"] += 1
+                        elif self._subscribers:
+                            self.publish(sse_frame("change", delta))
+            except asyncio.CancelledError:
+                raise
+            except OperationFailure as e:
+                if e.code == NO_REPLICA_SET_CODE:
+                    logger.warning("⚠ Change streams need a replica set, live feed falling back to polling")
+                    await self.poll()
+                    return
+                logger.error(f"⚠ Error in live feed stream: {e}", exc_info=True)
+            except Exception as e:
+                logger.error(f"⚠ Error in live feed stream: {e}", exc_info=True)
+            # Changes may have been missed while the stream was down
+            self.stats["restarts"] += 1
+            self.publish(sse_frame("resync", {}))
+            await asyncio.sleep(5)
+
+    async def poll(self):
+        """Fallback for a standalone mongod: one snapshot per interval, shared by all subscribers."""
+        self.mode = "polling"
+        while True:
+            await asyncio.sleep(LIVE_POLL_INTERVAL)
+            if not self._subscribers:
+                continue
+            try:
+                frame = sse_frame("snapshot", await self.load_snapshot())
+            except Exception as e:
+                logger.error(f"⚠ Error polling live feed snapshot: {e}", exc_info=True)
+                continue
+            self.stats["polls"] += 1
+            self.publish(frame)
+
+    def snapshot(self) -> dict:
+        return {"mode": self.mode, "subscribers": len(self._subscribers), **self.stats}
+
+
+live_feed = LiveFeed(db)
@@ -0,0 +1,213 @@
+import os
+import logging
+from datetime import datetime, timedelta, timezone
+from pymongo import ASCENDING, IndexModel
+from db_connection.database import db
+
+logger = logging.getLogger(__name__)
+
+# -------------------------------
+# Config
+# -------------------------------
+# "standard": one document per log row in `logs`, upserted on logid
+# "timeseries": rows go to a time-series collection keyed on the parsed dateTime
+LOG_STORAGE = os.getenv("LOG_STORAGE", "standard").lower()
+LOG_TIMESERIES_COLLECTION = os.getenv("LOG_TIMESERIES_COLLECTION", "logs_ts")
+# Per-level retention in days, e.g. "Info=7,Warn=30,Error=90"; empty keeps logs forever
+LOG_RETENTION = os.getenv("LOG_RETENTION", "")
+# Retention for levels not listed in LOG_RETENTION (0 = keep forever)
+LOG_RETENTION_DEFAULT_DAYS = int(os.getenv("LOG_RETENTION_DEFAULT_DAYS", 0))
+
+TIME_FIELD = "logTime"
+META_FIELD = "meta"
+LOG_QUERY_LIMIT = 2000
+
+
+def parse_retention(spec: str) -> dict:
+    retention = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        level, _, days = item.partition("=")
+        retention[level.strip().lower()] = int(days)
+    return retention
+
+
+RETENTION_DAYS = parse_retention(LOG_RETENTION)
+
+
+def retention_days(level) -> int:
+    return RETENTION_DAYS.get(str(level or "").lower(), LOG_RETENTION_DEFAULT_DAYS)
+
+
+def naive_utc(value: datetime) -> datetime:
+    """Naive UTC datetime, the form hub log times are stored in; naive input is taken as UTC."""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def parse_log_time(value):
+    """
+    Parse a hub log dateTime (UTC, up to 7 fractional digits) into a naive
+    UTC datetime; None (and a warning) when it cannot be parsed.
+    """
+    if isinstance(value, datetime):
+        return naive_utc(value)
+    text = str(value or "")
+    if "." in text:
+        head, _, frac = text.partition(".")
+        text = f"{head}.{frac[:6]}"
+    try:
+        return naive_utc(datetime.fromisoformat(text))
+    except ValueError:
+        logger.warning(f"⚠ Unparseable log dateTime {value!r}, keeping the raw value")
+        return None
+
+
+def logs_collection(storage: str = None):
+    if (storage or LOG_STORAGE) == "timeseries":
+        return db[LOG_TIMESERIES_COLLECTION]
+    return db.logs
+
+
+# -------------------------------
+# Row <-> stored document
+# -------------------------------
+def to_storage(row: dict) -> dict:
+    """Shape a hub log row for the configured storage mode."""
+    logged_at = parse_log_time(row.get("dateTime"))
+    # A row whose time is unknown is kept rather than expired on a guessed date
+    days = retention_days(row.get("Level")) if logged_at else 0
+    if LOG_STORAGE != "timeseries":
+        if not days:
+            return row
+        # TTL index on expireAt (expireAfterSeconds=0) removes the row at this time
+        return {**row, "expireAt": logged_at + timedelta(days=days)}
+
+    doc = {k: v for k, v in row.items() if k not in ("ExecutionID", "processName")}
+    # The time field is mandatory; the raw dateTime stays on the document either way
+    doc[TIME_FIELD] = logged_at or datetime.now(timezone.utc).replace(tzinfo=None)
+    doc[META_FIELD] = {
+        "ExecutionID": row.get("ExecutionID"),
+        "processName": row.get("processName"),
+        "retentionDays": days,
+    }
+    if logged_at is None:
+        doc["logTimeUnparsed"] = True
+    return doc
+
+
+def from_storage(doc: dict) -> dict:
+    """Return a stored log in the original `logs` document shape."""
+    meta = doc.pop(META_FIELD, None)
+    doc.pop(TIME_FIELD, None)
+    doc.pop("expireAt", None)
+    doc.pop("logTimeUnparsed", None)
+    if meta is not None:
+        doc["ExecutionID"] = meta.get("ExecutionID")
+        doc["processName"] = meta.get("processName")
+    return doc
+
+
+def execution_filter(execution_id: str, storage: str = None) -> dict:
+    if (storage or LOG_STORAGE) == "timeseries":
+        return {f"{META_FIELD}.ExecutionID": execution_id}
+    return {"ExecutionID": execution_id}
+
+
+async def execution_storage(execution_id: str) -> str:
+    """
+    Storage mode holding an execution's logs. In time-series mode, executions
+    written before the switch are still in the legacy `logs` collection.
+    """
+    if LOG_STORAGE == "timeseries":
+        if not await db[LOG_TIMESERIES_COLLECTION].find_one(execution_filter(execution_id), {"_id": 1}):
+            return "standard"
+    return LOG_STORAGE
+
+
+def log_query(execution_id: str, level: str = None, since: datetime = None, until: datetime = None,
+              storage: str = None) -> dict:
+    """Filter for one execution's logs, optionally by Level and dateTime range."""
+    storage = storage or LOG_STORAGE
+    query = execution_filter(execution_id, storage)
+    if level:
+        query["Level"] = level
+    if storage == "timeseries":
+        bounds_field, as_string = TIME_FIELD, False
+    else:
+        # dateTime is stored as the hub's ISO string, which sorts chronologically
+        bounds_field, as_string = "dateTime", True
+    bounds = {}
+    for op, value in (("$gte", since), ("$lt", until)):
+        if value:
+            value = naive_utc(value)
+            bounds[op] = value.isoformat() if as_string else value
+    if bounds:
+        query[bounds_field] = bounds
+    return query
+
+
+def log_page_order(storage: str = None):
+    """(sort field, needs _id tiebreak) for paging one execution's logs, matching the indexes."""
+    if (storage or LOG_STORAGE) == "timeseries":
+        return TIME_FIELD, True
+    return "logid", False
+
+
+# Projection names for fields that live under the metadata in time-series mode
+FIELD_ALIASES = {"ExecutionID": f"{META_FIELD}.ExecutionID", "processName": f"{META_FIELD}.processName"}
+
+
+def field_aliases(storage: str = None) -> dict:
+    return FIELD_ALIASES if (storage or LOG_STORAGE) == "timeseries" else {}
+
+
+async def find_logs_by_execution(execution_id: str, limit: int = LOG_QUERY_LIMIT) -> list:
+    """
+    Logs of one execution in the original document shape, whichever storage
+    mode is active. In time-series mode, executions written before the switch
+    are still read from the legacy `logs` collection.
+    """
+    docs = await logs_collection().find(execution_filter(execution_id)).to_list(limit)
+    if not docs and LOG_STORAGE == "timeseries":
+        docs = await db.logs.find({"ExecutionID": execution_id}).to_list(limit)
+    return [from_storage(d) for d in docs]
+
+
+# -------------------------------
+# Startup
+# -------------------------------
+async def ensure_log_storage():
+    """Create the time-series collection and the retention (TTL) indexes."""
+    if LOG_STORAGE != "timeseries":
+        if RETENTION_DAYS or LOG_RETENTION_DEFAULT_DAYS:
+            await db.logs.create_indexes([IndexModel([("expireAt", ASCENDING)], expireAfterSeconds=0)])
+            print(f"✔ Log retention enabled on 'logs': {RETENTION_DAYS} (default {LOG_RETENTION_DEFAULT_DAYS}d)")
+        return
+
+    existing_collections = await db.list_collection_names()
+    if LOG_TIMESERIES_COLLECTION not in existing_collections:
+        print(f"⚡ Time-series collection '{LOG_TIMESERIES_COLLECTION}' not found, creating it...")
+        await db.create_collection(
+            LOG_TIMESERIES_COLLECTION,
+            timeseries={"timeField": TIME_FIELD, "metaField": META_FIELD, "granularity": "seconds"},
+        )
+    else:
+        print(f"✔ Time-series collection '{LOG_TIMESERIES_COLLECTION}' already exists.")
+
+    collection = db[LOG_TIMESERIES_COLLECTION]
+    indexes = [
+        IndexModel([(f"{META_FIELD}.ExecutionID", ASCENDING), (TIME_FIELD, ASCENDING)]),
+        IndexModel([("logid", ASCENDING)]),
+    ]
+    # One partial TTL index per retention period (needs MongoDB 6.3+)
+    for days in sorted(set(RETENTION_DAYS.values()) | {LOG_RETENTION_DEFAULT_DAYS}):
+        if days > 0:
+            indexes.append(IndexModel(
+                [(TIME_FIELD, ASCENDING)],
+                name=f"ttl_{days}d",
+                expireAfterSeconds=days * 86400,
+                partialFilterExpression={f"{META_FIELD}.retentionDays": days},
+            ))
+    await collection.create_indexes(indexes)
+    print(f"✔ Log retention on '{LOG_TIMESERIES_COLLECTION}': {RETENTION_DAYS} (default {LOG_RETENTION_DEFAULT_DAYS}d)")
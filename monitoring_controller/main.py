@@ -4,10 +4,19 @@ import asyncio
 
 # Schedulers
 from db_connection.database import ensure_collections
-from scheduler.execution_scheduler.ws_client import run_ws_client
+from db_connection.log_store import ensure_log_storage
+from db_connection.audit_writer import job_audit_writer
+from db_connection.live_feed import live_feed
+from scheduler.execution_scheduler.supervisor import hub_supervisor
+from scheduler.execution_scheduler.ingest_writer import execution_writer, log_writer
+from scheduler.execution_scheduler.execution_cache import execution_cache
+from scheduler.execution_scheduler.execution_poller import execution_poller
+from scheduler.execution_scheduler.backfill import log_backfill
 from scheduler.db_scheduler.monitor_faulted_executions import monitor_faulted_executions
 from scheduler.monitor_email_replies.monitor_email_replies import monitor_email_replies
-from scheduler.execution_scheduler.utils.apis import get_token, negotiate_connection
+from utils.restart_web_connection import restart_session, process_catalog
+from scheduler.execution_scheduler.utils.apis import auth_manager
+from scheduler.db_scheduler.job_dispatcher import job_dispatcher
 
 # Routers
 from routers.jobs_router import router as jobs_router
@@ -17,6 +26,11 @@ from routers.rca_router import router as rca_router
 from routers.auditlogs_router import router as auditlogs_router
 from routers.email_router import router as email_router
 from routers.action_router import router as action_router
+from routers.metrics_router import router as metrics_router
+from routers.backfill_router import router as backfill_router
+from routers.export_router import router as export_router
+from routers.live_router import router as live_router
+from routers.dashboard_router import router as dashboard_router
 
 app = FastAPI(title="Automation Logging Server")
 
@@ -36,16 +50,35 @@ app.include_router(rca_router)
 app.include_router(auditlogs_router)
 app.include_router(email_router)
 app.include_router(action_router)
+app.include_router(metrics_router)
+app.include_router(backfill_router)
+app.include_router(export_router)
+app.include_router(live_router)
+app.include_router(dashboard_router)
 
 @app.on_event("startup")
 async def startup_event():
-    access_token = get_token()
-    connection_token = negotiate_connection(access_token)
-
     await ensure_collections()
+    await ensure_log_storage()
+    await execution_cache.load()
+    await execution_poller.load()
+    hub_supervisor.on_reconnect(log_backfill.catch_up)
 
-    asyncio.create_task(run_ws_client(access_token, connection_token))
+    asyncio.create_task(execution_writer.run())
+    asyncio.create_task(log_writer.run())
+    asyncio.create_task(hub_supervisor.run())
+    asyncio.create_task(log_backfill.resume_pending())
+    asyncio.create_task(restart_session.run())
+    asyncio.create_task(process_catalog.run())
     asyncio.create_task(monitor_faulted_executions())
+    asyncio.create_task(job_dispatcher.run())
     asyncio.create_task(monitor_email_replies())
+    asyncio.create_task(job_audit_writer.run())
+    asyncio.create_task(live_feed.run())
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await auth_manager.close()
+    await job_dispatcher.close()
 
 # uvicorn main:app --reload --port 8001
@@ -1,7 +1,11 @@
 from fastapi import APIRouter, HTTPException
 from bson import ObjectId
+from pymongo.errors import BulkWriteError
 from db_connection.database import db
+from datetime import datetime
 from schemas.auditlog_schema import AuditLog
+from typing import Optional
+from utils.pagination import paginate, parse_fields, time_range, DEFAULT_PAGE_SIZE
 
 router = APIRouter()
 
@@ -16,17 +20,34 @@ async def create_audit_log(audit: AuditLog):
 
 @router.post("/auditlogs")
 async def create_audit_logs(audits: list[AuditLog]):
-    inserted_ids = []
-    for audit in audits:
-        result = await db.auditlogs.insert_one(audit.model_dump())
-        inserted_ids.append(str(result.inserted_id))
-    return {"status": "Audit logs inserted", "inserted_ids": inserted_ids, "count": len(inserted_ids)}
+    """Insert a batch in one unordered insert_many; failed entries are reported by index."""
+    if not audits:
+        return {"status": "Audit logs inserted", "inserted_ids": [], "count": 0, "errors": []}
+    docs = [audit.model_dump() for audit in audits]
+    failed = {}
+    try:
+        await db.auditlogs.insert_many(docs, ordered=False)
+    except BulkWriteError as e:
+        failed = {err["index"]: err.get("errmsg", "write error") for err in e.details.get("writeErrors", [])}
+    # insert_many sets _id on every document before sending the batch
+    inserted_ids = [str(doc["_id"]) for i, doc in enumerate(docs) if i not in failed]
+    errors = [{"index": i, "error": msg} for i, msg in sorted(failed.items())]
+    status = "Audit logs partially inserted" if errors else "Audit logs inserted"
+    return {"status": status, "inserted_ids": inserted_ids, "count": len(inserted_ids), "errors": errors}
 
 @router.get("/auditlogs")
 async def get_audit_logs():
     logs = await db.auditlogs.find().to_list(2000)
     return [convert_id(l) for l in logs]
 
+@router.get("/auditlogs/page")
+async def get_audit_logs_page(limit: int = DEFAULT_PAGE_SIZE, cursor: Optional[str] = None, fields: Optional[str] = None,
+                              jobId: Optional[str] = None, jobType: Optional[str] = None, actor: Optional[str] = None,
+                              since: Optional[datetime] = None, until: Optional[datetime] = None):
+    query = {k: v for k, v in {"jobId": jobId, "jobType": jobType, "actor": actor}.items() if v is not None}
+    query.update(time_range("timestamp", since, until))
+    return await paginate(db.auditlogs, query, "timestamp", limit=limit, cursor=cursor, projection=parse_fields(fields))
+
 @router.get("/auditlogs/{audit_id}")
 async def get_audit_log_by_id(audit_id: str):
     audit = await db.auditlogs.find_one({"_id": ObjectId(audit_id)})
@@ -0,0 +1,34 @@
+from fastapi import APIRouter, HTTPException
+from bson import ObjectId
+from datetime import datetime
+from db_connection.database import db
+from scheduler.execution_scheduler.backfill import log_backfill, to_utc
+
+router = APIRouter()
+
+def convert_id(doc):
+    doc["_id"] = str(doc["_id"])
+    return doc
+
+@router.post("/backfill")
+async def start_backfill(since: datetime, until: datetime):
+    # Times without an offset are taken as UTC
+    since, until = to_utc(since), to_utc(until)
+    if since > until:
+        raise HTTPException(status_code=400, detail="'since' must be before 'until'")
+    job_id = await log_backfill.start(since, until)
+    return {"status": "Backfill started", "id": job_id}
+
+@router.get("/backfill")
+async def get_backfills():
+    jobs = await db.backfill_jobs.find({}, {"done_units": 0}).sort("CreatedAt", -1).to_list(100)
+    return [convert_id(j) for j in jobs]
+
+@router.get("/backfill/{job_id}")
+async def get_backfill_by_id(job_id: str):
+    job = await db.backfill_jobs.find_one({"_id": ObjectId(job_id)}, {"done_units": 0})
+    if not job:
+        raise HTTPException(status_code=404, detail="Backfill job not found")
+    job = convert_id(job)
+    job["progress"] = log_backfill.snapshot(job_id)
+    return job
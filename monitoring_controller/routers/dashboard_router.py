@@ -0,0 +1,74 @@
+import json
+import hashlib
+from datetime import datetime
+from typing import Optional
+from fastapi import APIRouter, Request, Response
+from fastapi.encoders import jsonable_encoder
+from db_connection.database import db
+from utils.pagination import keyset_query, page_result, time_range, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+
+router = APIRouter()
+
+# Compact row shape: the job fields the dashboard shows plus one joined document each
+EXECUTION_PROJECTION = {"_id": 0, "Process": 1, "Robot": 1, "EntryFile": 1, "State": 1, "StartTime": 1, "EndTime": 1}
+RCA_PROJECTION = {"_id": 0, "RCA_ID": 1, "Exception_Type": 1, "Root_Cause": 1, "Solution_Type": 1}
+AUDIT_PROJECTION = {"_id": 0, "jobType": 1, "actor": 1, "message": 1, "timestamp": 1}
+SUMMARY_PROJECTION = {
+    "ExecutionId": 1, "RCA_ID": 1, "status": 1, "is_mailsent": 1, "mailsent_text": 1,
+    "mailrecived_text": 1, "CreatedAt": 1, "UpdatedAt": 1,
+    "execution": {"$arrayElemAt": ["$execution", 0]},
+    "rca": {"$arrayElemAt": ["$rca", 0]},
+    "latest_audit": {"$arrayElemAt": ["$latest_audit", 0]},
+}
+
+
+def lookup_one(collection: str, local: str, foreign: str, stages: list, as_field: str) -> dict:
+    """`$lookup` by equality through `let` + `$expr`, which every server version accepts."""
+    return {"$lookup": {"from": collection, "let": {"key": f"${local}"},
+                        "pipeline": [{"$match": {"$expr": {"$eq": [f"${foreign}", "$$key"]}}}, *stages],
+                        "as": as_field}}
+
+
+def summary_pipeline(match: dict, sort: list, limit: int) -> list:
+    """
+    Jobs joined to their execution, RCA and newest audit entry. Paging runs
+    before the lookups, so only the rows on the page are joined, each through
+    an equality match on the joined collection's index.
+    """
+    return [
+        {"$match": match},
+        {"$sort": dict(sort)},
+        {"$limit": limit + 1},
+        lookup_one("executions", "ExecutionId", "ExecutionId",
+                   [{"$limit": 1}, {"$project": EXECUTION_PROJECTION}], "execution"),
+        lookup_one("rca", "RCA_ID", "RCA_ID", [{"$limit": 1}, {"$project": RCA_PROJECTION}], "rca"),
+        # Audit entries reference the job by its _id as a string
+        {"$addFields": {"job_key": {"$toString": "$_id"}}},
+        lookup_one("auditlogs", "job_key", "jobId",
+                   [{"$sort": {"timestamp": -1}}, {"$limit": 1}, {"$project": AUDIT_PROJECTION}], "latest_audit"),
+        {"$project": SUMMARY_PROJECTION},
+    ]
+
+
+@router.get("/dashboard/summary")
+async def get_dashboard_summary(request: Request, limit: int = DEFAULT_PAGE_SIZE, cursor: Optional[str] = None,
+                                status: Optional[str] = None, since: Optional[datetime] = None,
+                                until: Optional[datetime] = None):
+    """
+    One page of dashboard rows from a single aggregation, newest jobs first.
+    The body's hash is sent as an ETag; a poll with a matching If-None-Match
+    gets 304 Not Modified and no body.
+    """
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    query = {"status": status} if status else {}
+    query.update(time_range("CreatedAt", since, until))
+    match, sort = keyset_query(query, "CreatedAt", True, cursor)
+
+    docs = await db.jobs.aggregate(summary_pipeline(match, sort, limit)).to_list(limit + 1)
+    body = json.dumps(jsonable_encoder(page_result(docs, limit, "CreatedAt")), separators=(",", ":"))
+
+    etag = f'"{hashlib.sha1(body.encode()).hexdigest()}"'
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag in request.headers.get("if-none-match", ""):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
@@ -2,6 +2,8 @@ from fastapi import APIRouter, HTTPException
 from bson import ObjectId
 from db_connection.database import db
 from schemas.execution_schema import Execution
+from typing import Optional
+from utils.pagination import paginate, parse_fields, DEFAULT_PAGE_SIZE
 
 router = APIRouter()
 
@@ -19,6 +21,12 @@ async def get_executions():
     executions = await db.executions.find().to_list(2000)
     return [convert_id(e) for e in executions]
 
+@router.get("/executions/page")
+async def get_executions_page(limit: int = DEFAULT_PAGE_SIZE, cursor: Optional[str] = None, fields: Optional[str] = None,
+                              State: Optional[str] = None, Process: Optional[str] = None, Robot: Optional[str] = None):
+    query = {k: v for k, v in {"State": State, "Process": Process, "Robot": Robot}.items() if v is not None}
+    return await paginate(db.executions, query, limit=limit, cursor=cursor, projection=parse_fields(fields))
+
 @router.get("/executions/{execution_id}")
 async def get_execution_by_id(execution_id: str):
     execution = await db.executions.find_one({"ExecutionId": execution_id})
@@ -0,0 +1,72 @@
+import os
+import json
+import zlib
+from datetime import datetime
+from typing import Optional
+from fastapi import APIRouter
+from fastapi.responses import StreamingResponse
+from db_connection.database import db
+from db_connection.log_store import execution_storage, logs_collection, log_query, log_page_order, from_storage
+from utils.pagination import time_range, to_json
+
+router = APIRouter()
+
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", 1000))
+
+
+async def ndjson_lines(cursor, transform=None):
+    """Encode a cursor as NDJSON, one chunk per batch so memory stays flat."""
+    chunk = []
+    async for doc in cursor:
+        if transform:
+            doc = transform(doc)
+        chunk.append(json.dumps(doc, default=to_json))
+        if len(chunk) >= EXPORT_BATCH_SIZE:
+            yield ("\n".join(chunk) + "\n").encode()
+            chunk = []
+    if chunk:
+        yield ("\n".join(chunk) + "\n").encode()
+
+
+async def gzipped(chunks):
+    compressor = zlib.compressobj(wbits=31)  # gzip container
+    async for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def ndjson_response(cursor, filename: str, gzip: bool, transform=None):
+    body = ndjson_lines(cursor.batch_size(EXPORT_BATCH_SIZE), transform)
+    headers = {"Content-Disposition": f'attachment; filename="{filename}.ndjson"'}
+    if gzip:
+        body = gzipped(body)
+        headers["Content-Encoding"] = "gzip"
+    return StreamingResponse(body, media_type="application/x-ndjson", headers=headers)
+
+
+@router.get("/export/logs/{exicution_id}")
+async def export_logs(exicution_id: str, Level: Optional[str] = None,
+                      since: Optional[datetime] = None, until: Optional[datetime] = None, gzip: bool = False):
+    storage = await execution_storage(exicution_id)
+    sort_field, _ = log_page_order(storage)
+    cursor = logs_collection(storage).find(log_query(exicution_id, Level, since, until, storage)).sort(sort_field, 1)
+    return ndjson_response(cursor, f"logs_{exicution_id}", gzip, transform=from_storage)
+
+
+@router.get("/export/executions")
+async def export_executions(State: Optional[str] = None, Process: Optional[str] = None,
+                            Robot: Optional[str] = None, gzip: bool = False):
+    query = {k: v for k, v in {"State": State, "Process": Process, "Robot": Robot}.items() if v is not None}
+    return ndjson_response(db.executions.find(query), "executions", gzip)
+
+
+@router.get("/export/auditlogs")
+async def export_audit_logs(jobId: Optional[str] = None, since: Optional[datetime] = None,
+                            until: Optional[datetime] = None, gzip: bool = False):
+    query = {"jobId": jobId} if jobId else {}
+    query.update(time_range("timestamp", since, until))
+    cursor = db.auditlogs.find(query).sort("timestamp", 1)
+    name = f"auditlogs_{jobId}" if jobId else "auditlogs"
+    return ndjson_response(cursor, name, gzip)
@@ -1,8 +1,14 @@
 from fastapi import APIRouter, HTTPException
 from bson import ObjectId
+from bson.errors import InvalidId
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError
 from datetime import datetime, timezone
 from db_connection.database import db
-from schemas.job_schema import Job, JobUpdate
+from scheduler.db_scheduler.job_dispatcher import job_dispatcher
+from schemas.job_schema import Job, JobUpdate, JobBulkUpdateItem
+from typing import Optional
+from utils.pagination import paginate, parse_fields, time_range, DEFAULT_PAGE_SIZE
 
 router = APIRouter()
 
@@ -20,6 +26,14 @@ async def get_jobs():
     jobs = await db.jobs.find().sort("CreatedAt", -1).to_list(2000)
     return [convert_id(j) for j in jobs]
 
+@router.get("/jobs/page")
+async def get_jobs_page(limit: int = DEFAULT_PAGE_SIZE, cursor: Optional[str] = None, fields: Optional[str] = None,
+                        status: Optional[str] = None, ExecutionId: Optional[str] = None,
+                        since: Optional[datetime] = None, until: Optional[datetime] = None):
+    query = {k: v for k, v in {"status": status, "ExecutionId": ExecutionId}.items() if v is not None}
+    query.update(time_range("CreatedAt", since, until))
+    return await paginate(db.jobs, query, "CreatedAt", limit=limit, cursor=cursor, projection=parse_fields(fields))
+
 @router.get("/jobs/{job_id}")
 async def get_job_by_id(job_id: str):
     job = await db.jobs.find_one({"_id": ObjectId(job_id)})
@@ -27,17 +41,61 @@ async def get_job_by_id(job_id: str):
         raise HTTPException(status_code=404, detail="Job not found")
     return convert_id(job)
 
+@router.post("/jobs/{job_id}/redrive")
+async def redrive_job(job_id: str):
+    """Clear a job's dead letter so the next sweep sends it to the agent again."""
+    if not await job_dispatcher.redrive(ObjectId(job_id)):
+        raise HTTPException(status_code=404, detail="No dead-lettered job with this id")
+    return {"status": "Job re-driven", "id": job_id}
+
+@router.patch("/jobs/bulk")
+async def update_jobs_bulk(items: list[JobBulkUpdateItem]):
+    """Apply many job updates in one unordered bulk_write; every item gets its own result."""
+    now = datetime.now(timezone.utc)
+    results = [None] * len(items)
+    ops, op_items, ids = [], [], []
+    for i, item in enumerate(items):
+        try:
+            oid = ObjectId(item.id)
+        except (InvalidId, TypeError):
+            results[i] = {"id": item.id, "status": "error", "error": "Invalid job id"}
+            continue
+        update_data = {k: v for k, v in item.update.dict().items() if v is not None}
+        update_data["UpdatedAt"] = now
+        ops.append(UpdateOne({"_id": oid}, {"$set": update_data}))
+        op_items.append(i)
+        ids.append(oid)
+
+    failed = {}
+    if ops:
+        try:
+            await db.jobs.bulk_write(ops, ordered=False)
+        except BulkWriteError as e:
+            failed = {op_items[err["index"]]: err.get("errmsg", "write error")
+                      for err in e.details.get("writeErrors", [])}
+        # bulk_write only returns totals, so look up which ids exist to report misses
+        found = {doc["_id"] for doc in await db.jobs.find({"_id": {"$in": ids}}, {"_id": 1}).to_list(None)}
+        for i, oid in zip(op_items, ids):
+            if i in failed:
+                results[i] = {"id": items[i].id, "status": "error", "error": failed[i]}
+            elif oid not in found:
+                results[i] = {"id": items[i].id, "status": "not_found"}
+            else:
+                results[i] = {"id": items[i].id, "status": "updated"}
+
+    updated = sum(1 for r in results if r["status"] == "updated")
+    return {"updated": updated, "failed": len(results) - updated, "results": results}
+
 @router.put("/jobs/{job_id}")
 async def update_job(job_id: str, job: JobUpdate):
     update_data = {k: v for k, v in job.dict().items() if v is not None}
     update_data["UpdatedAt"] = datetime.now(timezone.utc)
 
-    result = await db.jobs.update_one(
+    updated_job = await db.jobs.find_one_and_update(
         {"_id": ObjectId(job_id)},
-        {"$set": update_data}
+        {"$set": update_data},
+        return_document=ReturnDocument.AFTER
     )
-    if result.matched_count == 0:
+    if not updated_job:
         raise HTTPException(status_code=404, detail="Job not found")
-
-    updated_job = await db.jobs.find_one({"_id": ObjectId(job_id)})
     return convert_id(updated_job)
@@ -0,0 +1,42 @@
+import os
+import asyncio
+from fastapi import APIRouter, Request
+from fastapi.responses import StreamingResponse
+from db_connection.live_feed import live_feed, sse_frame
+
+router = APIRouter()
+
+# Seconds between keep-alive comments on an idle stream
+LIVE_HEARTBEAT_INTERVAL = float(os.getenv("LIVE_HEARTBEAT_INTERVAL", 15))
+
+
+@router.get("/live/feed")
+async def live_feed_stream(request: Request):
+    """
+    Server-Sent Events: one `snapshot` event, then `change` deltas as they
+    happen. A `resync` event (or the stream ending) means deltas may have been
+    missed and the client should reconnect for a new snapshot. Without a
+    replica set, fresh `snapshot` events arrive periodically instead of deltas.
+    """
+    async def events():
+        # Subscribe before reading the snapshot so no change falls in between
+        queue = live_feed.subscribe()
+        try:
+            yield "retry: 3000\n\n"
+            yield sse_frame("snapshot", await live_feed.load_snapshot())
+            while True:
+                try:
+                    frame = await asyncio.wait_for(queue.get(), LIVE_HEARTBEAT_INTERVAL)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    yield ": ping\n\n"
+                    continue
+                if frame is None:
+                    break
+                yield frame
+        finally:
+            live_feed.unsubscribe(queue)
+
+    headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    return StreamingResponse(events(), media_type="text/event-stream", headers=headers)
@@ -1,6 +1,10 @@
 from fastapi import APIRouter, HTTPException
 from bson import ObjectId
 from db_connection.database import db
+from datetime import datetime
+from typing import Optional
+from db_connection.log_store import find_logs_by_execution, execution_storage, logs_collection, log_query, log_page_order, field_aliases, from_storage
+from utils.pagination import paginate, parse_fields, DEFAULT_PAGE_SIZE
 from schemas.logs_schema import Log
 
 router = APIRouter()
@@ -16,9 +20,21 @@ async def create_log(log: Log):
 
 @router.get("/logs/{exicution_id}")
 async def get_logs(exicution_id: str):
-    logs = await db.logs.find({"ExecutionID": exicution_id}).to_list(2000)
+    logs = await find_logs_by_execution(exicution_id)
     return [convert_id(l) for l in logs]
 
+@router.get("/logs/{exicution_id}/page")
+async def get_logs_page(exicution_id: str, limit: int = DEFAULT_PAGE_SIZE, cursor: Optional[str] = None,
+                        fields: Optional[str] = None, Level: Optional[str] = None,
+                        since: Optional[datetime] = None, until: Optional[datetime] = None):
+    storage = await execution_storage(exicution_id)
+    sort_field, tiebreak = log_page_order(storage)
+    return await paginate(
+        logs_collection(storage), log_query(exicution_id, Level, since, until, storage), sort_field,
+        limit=limit, cursor=cursor, projection=parse_fields(fields, aliases=field_aliases(storage)),
+        transform=from_storage, tiebreak=tiebreak,
+    )
+
 @router.get("/logs/{log_id}")
 async def get_log_by_id(log_id: str):
     log = await db.logs.find_one({"_id": ObjectId(log_id)})
@@ -0,0 +1,41 @@
+from fastapi import APIRouter
+from scheduler.execution_scheduler.ingest_queue import ingest_pipeline
+from scheduler.execution_scheduler.ingest_writer import execution_writer, log_writer
+from scheduler.execution_scheduler.supervisor import hub_supervisor
+from scheduler.execution_scheduler.execution_cache import execution_cache
+from scheduler.execution_scheduler.execution_poller import execution_poller
+from utils.restart_web_connection import restart_session, process_catalog
+from scheduler.db_scheduler.job_dispatcher import job_dispatcher
+from scheduler.db_scheduler.job_lease import job_leases
+from db_connection.audit_writer import job_audit_writer
+from db_connection.live_feed import live_feed
+
+router = APIRouter()
+
+@router.get("/metrics/ingest")
+async def get_ingest_metrics():
+    return {
+        "queue": ingest_pipeline.snapshot(),
+        "writers": {
+            "executions": execution_writer.stats,
+            "logs": log_writer.stats,
+        },
+        "execution_cache": execution_cache.snapshot(),
+        "execution_poller": {**execution_poller.stats, "cursor": execution_poller.cursor},
+    }
+
+@router.get("/metrics/hub")
+async def get_hub_metrics():
+    return {**hub_supervisor.snapshot(), "restart_session": restart_session.stats, "process_catalog": process_catalog.stats}
+
+@router.get("/metrics/dispatch")
+async def get_dispatch_metrics():
+    return {**job_dispatcher.snapshot(), "leases": job_leases.stats}
+
+@router.get("/metrics/audit")
+async def get_audit_metrics():
+    return job_audit_writer.stats
+
+@router.get("/metrics/live")
+async def get_live_metrics():
+    return live_feed.snapshot()
@@ -3,6 +3,8 @@ from bson import ObjectId
 from datetime import datetime, timezone
 from db_connection.database import db
 from schemas.rca_schema import RCA, RCAUpdate
+from typing import Optional
+from utils.pagination import paginate, parse_fields, DEFAULT_PAGE_SIZE
 
 router = APIRouter()
 
@@ -20,6 +22,13 @@ async def get_rcas():
     rcas = await db.rca.find().to_list(2000)
     return [convert_id(r) for r in rcas]
 
+@router.get("/rca/page")
+async def get_rcas_page(limit: int = DEFAULT_PAGE_SIZE, cursor: Optional[str] = None, fields: Optional[str] = None,
+                        Process_Name: Optional[str] = None, State: Optional[str] = None,
+                        Solution_Type: Optional[str] = None):
+    query = {k: v for k, v in {"Process_Name": Process_Name, "State": State, "Solution_Type": Solution_Type}.items() if v is not None}
+    return await paginate(db.rca, query, limit=limit, cursor=cursor, projection=parse_fields(fields))
+
 @router.get("/rca/{rca_id}")
 async def get_rca_by_id(rca_id: str):
     rca = await db.rca.find_one({"_id": ObjectId(rca_id)})
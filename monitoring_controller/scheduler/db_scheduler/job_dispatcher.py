@@ -0,0 +1,227 @@
+import os
+import time
+import uuid
+import random
+import asyncio
+import logging
+import aiohttp
+from datetime import datetime, timedelta, timezone
+from db_connection.database import db
+from scheduler.db_scheduler.job_lease import job_leases
+
+logger = logging.getLogger(__name__)
+
+# ---------------------------
+# Config
+# ---------------------------
+AGENT_EVENT_URL = os.getenv("AGENT_EVENT_URL", "http://127.0.0.1:8000/v1/event")
+DISPATCH_CONCURRENCY = int(os.getenv("DISPATCH_CONCURRENCY", 4))
+DISPATCH_MAX_ATTEMPTS = int(os.getenv("DISPATCH_MAX_ATTEMPTS", 5))
+DISPATCH_RETRY_BASE_DELAY = float(os.getenv("DISPATCH_RETRY_BASE_DELAY", 2))
+DISPATCH_RETRY_MAX_DELAY = float(os.getenv("DISPATCH_RETRY_MAX_DELAY", 60))
+# The agent answers only once its run is finished, so allow for a long call
+DISPATCH_TIMEOUT = float(os.getenv("DISPATCH_TIMEOUT", 900))
+# Client errors worth another try; every 5xx is retried as well
+RETRYABLE_STATUSES = {408, 429}
+# Dead-lettered jobs are sent again after this long, at most DISPATCH_MAX_REDRIVES times
+DISPATCH_REDRIVE_INTERVAL = float(os.getenv("DISPATCH_REDRIVE_INTERVAL", 3600))
+DISPATCH_MAX_REDRIVES = int(os.getenv("DISPATCH_MAX_REDRIVES", 3))
+
+
+class JobDispatcher:
+    """
+    Sends leased jobs to the agent's /v1/event endpoint.
+
+    All requests share one pooled aiohttp session and at most
+    DISPATCH_CONCURRENCY run at once; further jobs wait their turn while this
+    instance keeps their lease alive. A job already queued or running is not
+    submitted twice. Connection errors, timeouts, 5xx, 408 and 429 are
+    retried with jittered exponential backoff. Every attempt of one dispatch
+    carries the same Idempotency-Key, so the agent can recognise a resend of
+    a run it already started, and a job that turned Completed in the
+    meantime is not sent again. A job still failing after
+    DISPATCH_MAX_ATTEMPTS tries, or refused with another 4xx, is written to
+    `dispatch_dead_letters` and flagged so sweeps stop re-sending it until
+    `redrive` clears the flag.
+    """
+
+    def __init__(self, leases, concurrency: int = DISPATCH_CONCURRENCY):
+        self.leases = leases
+        self.concurrency = concurrency
+        self._session = None
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._in_flight = {}
+        self._active = 0
+        self.stats = {
+            "submitted": 0,
+            "deduplicated": 0,
+            "started": 0,
+            "succeeded": 0,
+            "retries": 0,
+            "dead_lettered": 0,
+            "redriven": 0,
+            "latency_ms_total": 0.0,
+            "latency_ms_max": 0.0,
+            "queue_wait_ms_total": 0.0,
+        }
+
+    def _http(self):
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                timeout=aiohttp.ClientTimeout(total=DISPATCH_TIMEOUT),
+                connector=aiohttp.TCPConnector(limit=self.concurrency),
+            )
+        return self._session
+
+    # ---------------------------
+    # Submitting
+    # ---------------------------
+    def submit(self, job_id) -> bool:
+        """Queue a job this instance has leased; False if it is already in flight."""
+        key = str(job_id)
+        if key in self._in_flight:
+            self.stats["deduplicated"] += 1
+            return False
+        self.stats["submitted"] += 1
+        task = asyncio.create_task(self._run(job_id, time.perf_counter()))
+        self._in_flight[key] = task
+        task.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        return True
+
+    async def _run(self, job_id, queued_at):
+        try:
+            async with self.leases.held(job_id):
+                async with self._semaphore:
+                    self.stats["started"] += 1
+                    self.stats["queue_wait_ms_total"] += (time.perf_counter() - queued_at) * 1000
+                    self._active += 1
+                    try:
+                        await self._dispatch(job_id)
+                    finally:
+                        self._active -= 1
+        except Exception as e:
+            logger.error(f"⚠ Dispatch of job {job_id} failed: {e}", exc_info=True)
+
+    # ---------------------------
+    # Sending
+    # ---------------------------
+    async def _dispatch(self, job_id):
+        last_error = None
+        headers = {"Idempotency-Key": f"{job_id}:{uuid.uuid4().hex}"}
+        for attempt in range(1, DISPATCH_MAX_ATTEMPTS + 1):
+            if attempt > 1 and await self._completed(job_id):
+                logger.info(f"✅ Job {job_id} completed meanwhile, not resending")
+                return
+            logger.info(f"🚀 Sending job {job_id} to the agent (attempt {attempt})...")
+            started = time.perf_counter()
+            retry = True
+            try:
+                async with self._http().post(AGENT_EVENT_URL, params={"jobid": str(job_id)}, headers=headers) as response:
+                    await response.read()
+                    status = response.status
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                status, last_error = None, str(e) or type(e).__name__
+            latency_ms = (time.perf_counter() - started) * 1000
+
+            if status is not None and 200 <= status < 300:
+                self.stats["succeeded"] += 1
+                self.stats["latency_ms_total"] += latency_ms
+                self.stats["latency_ms_max"] = max(self.stats["latency_ms_max"], latency_ms)
+                logger.info(f"✅ Job {job_id} sent in {latency_ms:.0f} ms (status={status})")
+                return
+
+            if status is not None:
+                last_error = f"HTTP {status}"
+                retry = status >= 500 or status in RETRYABLE_STATUSES
+            logger.warning(f"❌ Sending job {job_id} failed: {last_error}")
+            if not retry:
+                break
+            if attempt < DISPATCH_MAX_ATTEMPTS:
+                self.stats["retries"] += 1
+                delay = min(DISPATCH_RETRY_MAX_DELAY, DISPATCH_RETRY_BASE_DELAY * 2 ** (attempt - 1))
+                await asyncio.sleep(delay * random.uniform(0.5, 1.0))
+
+        await self._dead_letter(job_id, attempt, last_error)
+
+    async def _completed(self, job_id) -> bool:
+        job = await db.jobs.find_one({"_id": job_id}, {"status": 1})
+        return bool(job) and job.get("status") == "Completed"
+
+    async def _dead_letter(self, job_id, attempts, last_error):
+        self.stats["dead_lettered"] += 1
+        now = datetime.now(timezone.utc)
+        await db.dispatch_dead_letters.insert_one({
+            "jobId": str(job_id),
+            "attempts": attempts,
+            "last_error": last_error,
+            "url": AGENT_EVENT_URL,
+            "FailedAt": now,
+        })
+        await db.jobs.update_one(
+            {"_id": job_id},
+            {"$set": {"dead_lettered": True, "DeadLetteredAt": now, "UpdatedAt": now}},
+        )
+        logger.error(f"☠ Job {job_id} dead-lettered after {attempts} attempts: {last_error}")
+
+    # ---------------------------
+    # Re-driving dead letters
+    # ---------------------------
+    async def redrive(self, job_id=None) -> int:
+        """
+        Lease dead-lettered jobs, clear their flag and send them again. Without
+        a job id, re-drives jobs dead-lettered over DISPATCH_REDRIVE_INTERVAL
+        ago that have been re-driven fewer than DISPATCH_MAX_REDRIVES times; an
+        explicit re-drive also resets that count.
+        """
+        now = datetime.now(timezone.utc)
+        if job_id is not None:
+            query = {"_id": job_id, "dead_lettered": True}
+            update = {"$set": {"dead_lettered": False, "redrives": 0, "UpdatedAt": now}}
+        else:
+            query = {
+                "dead_lettered": True,
+                "DeadLetteredAt": {"$lte": now - timedelta(seconds=DISPATCH_REDRIVE_INTERVAL)},
+                "redrives": {"$not": {"$gte": DISPATCH_MAX_REDRIVES}},
+            }
+            update = {"$set": {"dead_lettered": False, "UpdatedAt": now}, "$inc": {"redrives": 1}}
+        job_ids = [job["_id"] for job in await self.leases.claim_all(query, projection={"_id": 1})]
+        if not job_ids:
+            return 0
+        await db.jobs.update_many({"_id": {"$in": job_ids}}, update)
+        self.stats["redriven"] += len(job_ids)
+        logger.info(f"♻ Re-driving {len(job_ids)} dead-lettered jobs")
+        for job_id in job_ids:
+            self.submit(job_id)
+        return len(job_ids)
+
+    async def run(self):
+        """Periodically re-drive dead-lettered jobs."""
+        while True:
+            await asyncio.sleep(DISPATCH_REDRIVE_INTERVAL)
+            try:
+                await self.redrive()
+            except Exception as e:
+                logger.error(f"⚠ Dead letter re-drive failed: {e}", exc_info=True)
+
+    # ---------------------------
+    # Lifecycle / metrics
+    # ---------------------------
+    async def close(self):
+        if self._session and not self._session.closed:
+            await self._session.close()
+
+    def snapshot(self) -> dict:
+        succeeded = self.stats["succeeded"]
+        started = self.stats["started"]
+        return {
+            **self.stats,
+            "concurrency": self.concurrency,
+            "in_flight": len(self._in_flight),
+            "active": self._active,
+            "queue_depth": len(self._in_flight) - self._active,
+            "latency_ms_avg": round(self.stats["latency_ms_total"] / succeeded, 1) if succeeded else 0.0,
+            "queue_wait_ms_avg": round(self.stats["queue_wait_ms_total"] / started, 1) if started else 0.0,
+        }
+
+
+job_dispatcher = JobDispatcher(job_leases)
@@ -0,0 +1,128 @@
+import os
+import uuid
+import socket
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
+from pymongo import ReturnDocument
+from db_connection.database import db
+
+logger = logging.getLogger(__name__)
+
+# ---------------------------
+# Config
+# ---------------------------
+JOB_LEASE_TTL = float(os.getenv("JOB_LEASE_TTL", 120))
+# Identifies this controller instance as a lease owner
+CONTROLLER_ID = os.getenv("CONTROLLER_ID") or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+
+
+class JobLeases:
+    """
+    Job ownership for one or more controller instances.
+
+    A job is claimed with a single find_one_and_update that only matches
+    when nobody holds it or the holder's lease has expired, so two ticks or
+    two replicas can never both dispatch it. The holder renews the lease on
+    a heartbeat while it works and releases it when done; a crashed holder's
+    lease simply runs out and the job becomes claimable again.
+    `is_running` is kept in step for the dashboard.
+    """
+
+    def __init__(self, collection, owner: str = CONTROLLER_ID, ttl: float = JOB_LEASE_TTL):
+        self.collection = collection
+        self.owner = owner
+        self.ttl = ttl
+        self.stats = {"claimed": 0, "renewed": 0, "released": 0, "lost": 0, "reclaimed": 0}
+
+    def _expiry(self):
+        return datetime.now(timezone.utc) + timedelta(seconds=self.ttl)
+
+    def lease_fields(self) -> dict:
+        """Fields for a job that is created already leased by this instance."""
+        return {"is_running": True, "lease_owner": self.owner, "lease_expires": self._expiry()}
+
+    @staticmethod
+    def free_filter() -> dict:
+        return {"$or": [
+            {"lease_owner": None},
+            {"lease_expires": {"$lt": datetime.now(timezone.utc)}},
+        ]}
+
+    # ---------------------------
+    # Claiming
+    # ---------------------------
+    async def claim(self, query: dict, projection=None):
+        """Atomically lease one job matching `query`; returns it, or None."""
+        job = await self.collection.find_one_and_update(
+            {"$and": [query, self.free_filter()]},
+            {"$set": self.lease_fields()},
+            projection=projection,
+            return_document=ReturnDocument.AFTER,
+        )
+        if job:
+            self.stats["claimed"] += 1
+        return job
+
+    async def claim_all(self, query: dict, projection=None, limit: int = 100) -> list:
+        """Lease up to `limit` matching jobs, one round trip per claimed job."""
+        jobs = []
+        while len(jobs) < limit:
+            job = await self.claim(query, projection)
+            if not job:
+                break
+            jobs.append(job)
+        return jobs
+
+    # ---------------------------
+    # Holding
+    # ---------------------------
+    async def renew(self, job_id) -> bool:
+        result = await self.collection.update_one(
+            {"_id": job_id, "lease_owner": self.owner},
+            {"$set": {"lease_expires": self._expiry()}},
+        )
+        if result.matched_count:
+            self.stats["renewed"] += 1
+            return True
+        self.stats["lost"] += 1
+        return False
+
+    async def release(self, job_id):
+        await self.collection.update_one(
+            {"_id": job_id, "lease_owner": self.owner},
+            {"$set": {"is_running": False, "lease_owner": None, "lease_expires": None}},
+        )
+        self.stats["released"] += 1
+
+    @asynccontextmanager
+    async def held(self, job_id):
+        """Renew the lease every ttl/3 seconds while the block runs, then release it."""
+        async def heartbeat():
+            while True:
+                await asyncio.sleep(self.ttl / 3)
+                if not await self.renew(job_id):
+                    logger.warning(f"⚠ Lost lease on job {job_id}")
+                    return
+
+        beat = asyncio.create_task(heartbeat())
+        try:
+            yield
+        finally:
+            beat.cancel()
+            await self.release(job_id)
+
+    async def reclaim_expired(self) -> int:
+        """Clear leases whose holder stopped heartbeating (crashed or partitioned)."""
+        result = await self.collection.update_many(
+            {"lease_owner": {"$ne": None}, "lease_expires": {"$lt": datetime.now(timezone.utc)}},
+            {"$set": {"is_running": False, "lease_owner": None, "lease_expires": None}},
+        )
+        if result.modified_count:
+            self.stats["reclaimed"] += result.modified_count
+            logger.info(f"♻ Reclaimed {result.modified_count} expired job leases")
+        return result.modified_count
+
+
+job_leases = JobLeases(db.jobs)
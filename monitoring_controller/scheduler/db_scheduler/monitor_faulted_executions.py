@@ -1,9 +1,12 @@
+import os
 import logging
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 import asyncio
-import aiohttp
-from db_connection.database import db
+from pymongo.errors import BulkWriteError, OperationFailure
+from db_connection.database import db, load_state, save_state, NO_REPLICA_SET_CODE, RESUME_FAILED_CODES
 from schemas.job_schema import Job
+from scheduler.db_scheduler.job_lease import job_leases
+from scheduler.db_scheduler.job_dispatcher import job_dispatcher
 
 # ---------------------------
 # Configure Logging
@@ -15,102 +18,182 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-
-async def process_faulted_executions():
+# ---------------------------
+# Config
+# ---------------------------
+# Full sweep interval while the change stream is delivering faults
+FAULT_RECONCILE_INTERVAL = float(os.getenv("FAULT_RECONCILE_INTERVAL", 300))
+RESUME_TOKEN_KEY = "faulted_executions_resume_token"
+# Sweeps only scan executions ingested after this watermark (minus the overlap)
+FAULT_WATERMARK_KEY = "faulted_executions_watermark"
+FAULT_WATERMARK_OVERLAP = 60
+
+# Inserts/replaces of a Faulted execution and updates that set State to Faulted
+FAULTED_PIPELINE = [
+    {"$match": {"$or": [
+        {"operationType": {"$in": ["insert", "replace"]}, "fullDocument.State": "Faulted"},
+        {"operationType": "update", "updateDescription.updatedFields.State": "Faulted"},
+    ]}},
+    {"$project": {"operationType": 1, "documentKey": 1, "fullDocument.ExecutionId": 1}},
+]
+
+
+async def find_unjobbed_faults(exec_ids=None, since=None):
+    """
+    ExecutionIds of Faulted executions that have no job yet: one query for
+    the faults, then one batched `$in` lookup on the jobs' ExecutionId index.
+    Limited to `exec_ids`, or to executions ingested since the `since` watermark.
+    """
+    query = {"State": "Faulted"}
+    if exec_ids is not None:
+        query["ExecutionId"] = {"$in": list(exec_ids)}
+    elif since is not None:
+        query["IngestedAt"] = {"$gte": since}
+
+    faults = [doc["ExecutionId"] async for doc in db.executions.find(query, {"_id": 0, "ExecutionId": 1})]
+    if not faults:
+        return []
+    jobbed = {
+        doc["ExecutionId"]
+        async for doc in db.jobs.find({"ExecutionId": {"$in": faults}}, {"_id": 0, "ExecutionId": 1})
+    }
+    return [exec_id for exec_id in faults if exec_id not in jobbed]
+
+
+async def create_jobs(exec_ids):
+    """
+    Insert one 'Started' job per execution in a single insert_many, already
+    leased by this controller; returns the new job ids.
     """
-    Check for executions with status 'Faulted'.
-    For each, check if a job already exists; if not, create it.
-    Always send POST request with job_id.
+    if not exec_ids:
+        return []
+    now = datetime.now(timezone.utc)
+    docs = [
+        Job(
+            ExecutionId=exec_id,
+            status="Started",
+            is_mailsent=False,
+            mailrecived_text="",
+            mailsent_text="",
+            CreatedAt=now,
+            **job_leases.lease_fields(),
+        ).model_dump() | {"JobType": "RetryFaulted"}
+        for exec_id in exec_ids
+    ]
+    try:
+        await db.jobs.insert_many(docs, ordered=False)
+        return [d["_id"] for d in docs]
+    except BulkWriteError as e:
+        # Duplicate ExecutionId: another controller created that job first
+        failed = {err["index"] for err in e.details.get("writeErrors", [])}
+        others = [err for err in e.details.get("writeErrors", []) if err.get("code") != 11000]
+        if others:
+            logger.error(f"⚠ Failed to create {len(others)} jobs: {others}")
+        return [d["_id"] for i, d in enumerate(docs) if i not in failed]
+
+
+async def claim_actionable_jobs(exec_ids=None):
+    """
+    Lease the existing jobs that need (re)sending to the agent: not
+    Completed/Started, and either a mail reply arrived or no mail was sent yet.
+    Jobs leased by another instance (or an earlier tick) and dead-lettered
+    jobs are skipped.
+    """
+    query = {
+        "status": {"$nin": ["Completed", "Started"]},
+        "dead_lettered": {"$ne": True},
+        "$or": [
+            {"mailrecived_text": {"$nin": ["", None]}},
+            {"is_mailsent": {"$ne": True}},
+        ],
+    }
+    if exec_ids is not None:
+        query["ExecutionId"] = {"$in": list(exec_ids)}
+    jobs = await job_leases.claim_all(query, projection={"_id": 1})
+    return [job["_id"] for job in jobs]
+
+
+async def process_faulted_executions(exec_ids=None):
+    """
+    Create jobs for newly Faulted executions and send every job that needs
+    action to the agent. With `exec_ids`, only those executions are checked;
+    otherwise the scan covers executions ingested since the stored watermark.
     """
     logger.info("🔍 Checking for faulted executions...")
 
     try:
-        async for exec_doc in db.executions.find({"State": "Faulted"}):
-            exec_id = exec_doc.get("ExecutionId")
-            logger.info(f"➡ Processing Faulted ExecutionId: {exec_id}")
-
-            # Check if job already exists for this ExecutionId
-            job_doc = await db.jobs.find_one({"ExecutionId": exec_id})
-            isNew = False
-
-            if job_doc:
-                job_id = job_doc["_id"]
-                logger.info(f"🔹 Existing job found | ExecutionId={exec_id}, JobId={job_id}")
-            else:
-                # Create new job structure
-                logger.info(f"🆕 No job found for ExecutionId={exec_id}, creating new job...")
-                job_doc = {
-                    "ExecutionId": exec_id,
-                    "JobType": "RetryFaulted",
-                    "status": "Not Started",
-                    "is_mailsent": False,
-                    "is_running": False,
-                    "mailrecived_text": "",
-                    "mailsent_text": "",
-                    "CreatedAt": datetime.now(timezone.utc)
-                }
-                isNew = True
-
-            if job_doc["is_running"]:
-                logger.info(
-                    f"⏸ Job is currently running | ExecutionId={exec_id} | Skipping further processing."
-                )
-                continue
-            # Check job state before processing further
-            if job_doc["status"] in ["Completed", "Started"]:
-                logger.info(
-                    f"⏭ Skipping ExecutionId={exec_id} | Job status='{job_doc['status']}'"
-                )
-                continue
-
-            # Create job if new
-            if isNew:
-                logger.info(f"📝 Creating job in DB for ExecutionId={exec_id}...")
-                job_doc["status"] = "Started"
-                job_data = Job(**job_doc)
-                result = await db.jobs.insert_one(job_data.model_dump())
-                job_id = result.inserted_id
-                logger.info(f"✅ New job created | JobId={job_id}")
-
-            # Decide whether to send API call
-            should_send = (
-                job_doc.get("mailrecived_text")
-                or isNew
-                # or not job_doc.get("RCA_ID")
-                or not job_doc.get("is_mailsent")
-            )
-
-            if should_send:
-                logger.info(f"📨 Triggering API call for JobId={job_id}...")
-                asyncio.create_task(send_job_api(job_id))
-            else:
-                logger.info(f"⛔ API not triggered for JobId={job_id} (conditions not met)")
+        since = None
+        if exec_ids is None:
+            await job_leases.reclaim_expired()
+            since = await load_state(FAULT_WATERMARK_KEY)
+            # Overlap so executions stamped just before the scan but committed after it are not skipped
+            next_watermark = datetime.now(timezone.utc) - timedelta(seconds=FAULT_WATERMARK_OVERLAP)
+
+        new_faults = await find_unjobbed_faults(exec_ids, since)
+        new_jobs = await create_jobs(new_faults)
+        if new_jobs:
+            logger.info(f"🆕 Created {len(new_jobs)} jobs for newly faulted executions")
+
+        # New jobs are 'Started', so the two lists never overlap
+        pending_jobs = await claim_actionable_jobs(exec_ids)
+        for job_id in new_jobs + pending_jobs:
+            logger.info(f"📨 Queueing JobId={job_id} for the agent...")
+            job_dispatcher.submit(job_id)
+
+        if exec_ids is None:
+            await save_state(FAULT_WATERMARK_KEY, next_watermark)
 
     except Exception as e:
         logger.error(f"⚠ Error processing faulted executions: {e}", exc_info=True)
 
 
-
-async def send_job_api(job_id):
-    api_url = f"http://127.0.0.1:8000/v1/event?jobid={job_id}"
-
-    logger.info(f"🚀 Sending POST request for JobId={job_id}...")
-
-    async with aiohttp.ClientSession() as session:
+async def watch_faulted_executions():
+    """
+    Handle executions as they turn Faulted, from a change stream on `executions`.
+    The resume token is saved after every handled event, so a restart picks up
+    where the previous process stopped. Returns if change streams are unavailable.
+    """
+    while True:
+        resume_token = await load_state(RESUME_TOKEN_KEY)
         try:
-            async with session.post(api_url) as response:
-                if response.status in (200, 201):
-                    logger.info(f"✅ Successfully sent job {job_id} to API (status={response.status})")
-                else:
-                    logger.warning(f"❌ Failed to send job {job_id} (status={response.status})")
+            async with db.executions.watch(
+                FAULTED_PIPELINE, full_document="updateLookup", resume_after=resume_token
+            ) as stream:
+                logger.info(f"👀 Watching executions for faults (resumed={resume_token is not None})")
+                async for change in stream:
+                    exec_id = (change.get("fullDocument") or {}).get("ExecutionId")
+                    if exec_id:
+                        logger.info(f"⚡ Execution turned Faulted: {exec_id}")
+                        await process_faulted_executions([exec_id])
+                    await save_state(RESUME_TOKEN_KEY, stream.resume_token)
+        except asyncio.CancelledError:
+            raise
+        except OperationFailure as e:
+            if e.code == NO_REPLICA_SET_CODE:
+                logger.warning("⚠ Change streams need a replica set, falling back to polling")
+                return
+            if e.code in RESUME_FAILED_CODES:
+                # Events since the token are gone; the sweep covers the gap
+                logger.warning(f"⚠ Fault stream resume token expired ({e.code}), reconciling")
+                await save_state(RESUME_TOKEN_KEY, None)
+                await process_faulted_executions()
+                continue
+            logger.error(f"⚠ Error in fault change stream: {e}", exc_info=True)
         except Exception as e:
-            logger.error(f"⚠ Error sending job {job_id} to API: {e}", exc_info=True)
-
+            logger.error(f"⚠ Error in fault change stream: {e}", exc_info=True)
+        await asyncio.sleep(5)
 
 
 async def monitor_faulted_executions(poll_interval=10):
-    logger.info(f"🕒 Starting monitoring loop (poll interval={poll_interval}s)...")
+    """
+    Change-stream fault detection plus a reconciliation sweep every
+    FAULT_RECONCILE_INTERVAL seconds (every `poll_interval` seconds when
+    change streams are unavailable).
+    """
+    watcher = asyncio.create_task(watch_faulted_executions())
+    logger.info(f"🕒 Starting fault monitor (reconcile interval={FAULT_RECONCILE_INTERVAL}s)...")
     while True:
         await process_faulted_executions()
-        logger.info("⏳ Waiting for next poll...")
-        await asyncio.sleep(poll_interval)
+        interval = poll_interval if watcher.done() else FAULT_RECONCILE_INTERVAL
+        logger.info(f"⏳ Next reconciliation sweep in {interval:.0f}s")
+        await asyncio.sleep(interval)
@@ -0,0 +1,260 @@
+import os
+import time
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from bson import ObjectId
+from db_connection.database import db
+from scheduler.execution_scheduler.ingest_writer import log_writer
+from scheduler.execution_scheduler.utils.apis import get_token, negotiate_connection
+from scheduler.execution_scheduler.utils.hub_client import HubClient
+
+logger = logging.getLogger(__name__)
+
+# -------------------------------
+# Config
+# -------------------------------
+BACKFILL_CONCURRENCY = int(os.getenv("BACKFILL_CONCURRENCY", 4))
+BACKFILL_PAGE_SIZE = int(os.getenv("BACKFILL_PAGE_SIZE", 200))
+BACKFILL_REQUEST_TIMEOUT = float(os.getenv("BACKFILL_REQUEST_TIMEOUT", 30))
+# Reconnect gaps shorter than this (token refreshes) inside one day are left to the watermark poll
+BACKFILL_MIN_GAP = float(os.getenv("BACKFILL_MIN_GAP", 300))
+
+
+def to_utc(dt: datetime) -> datetime:
+    """Aware UTC datetime; naive values (hub times, Mongo dates) are already UTC."""
+    if dt.tzinfo is None:
+        return dt.replace(tzinfo=timezone.utc)
+    return dt.astimezone(timezone.utc)
+
+
+def parse_hub_time(value):
+    """Parse an execution StartTime/EndTime into an aware UTC datetime, or None."""
+    if value is None or value == "":
+        return None
+    if isinstance(value, datetime):
+        return to_utc(value)
+    try:
+        return to_utc(datetime.fromisoformat(str(value).replace("Z", "+00:00")))
+    except ValueError:
+        return None
+
+
+def day_windows(since: datetime, until: datetime):
+    day = since.date()
+    while day <= until.date():
+        yield day
+        day += timedelta(days=1)
+
+
+class LogBackfill:
+    """
+    Re-fetches ViewLogExecution for every execution overlapping a time range,
+    one request per (execution, day, page), BACKFILL_CONCURRENCY executions at
+    a time. Progress is checkpointed per (execution, day) in `backfill_jobs`
+    so an interrupted job resumes where it stopped.
+
+    Runs on its own hub connection: every invocation is awaited until its
+    completion arrives, and the pushed viewLogExecution page that precedes it
+    is attributed to the execution that has the one outstanding request.
+    """
+
+    def __init__(self):
+        self._tasks = {}
+        self._last_poll_at = None
+        self.progress = {}
+
+    # ---------------------------
+    # Jobs
+    # ---------------------------
+    async def start(self, since: datetime, until: datetime, reason: str = "admin") -> str:
+        job = {
+            "since": to_utc(since),
+            "until": to_utc(until),
+            "reason": reason,
+            "status": "running",
+            "units_total": None,
+            "units_done": 0,
+            "done_units": [],
+            "logs_received": 0,
+            "CreatedAt": datetime.now(timezone.utc),
+        }
+        result = await db.backfill_jobs.insert_one(job)
+        job_id = str(result.inserted_id)
+        self._launch(job_id)
+        return job_id
+
+    async def catch_up(self, since: float, until: float):
+        """HubSupervisor reconnect hook: backfill the downtime gap."""
+        since, until = datetime.fromtimestamp(since, timezone.utc), datetime.fromtimestamp(until, timezone.utc)
+        if (until - since).total_seconds() < BACKFILL_MIN_GAP and since.date() == until.date():
+            # The live poll resumes from the stored watermarks and covers a short gap
+            logger.info(f"🔄 Reconnect gap of {(until - since).total_seconds():.0f}s left to the watermark poll")
+            return
+        job_id = await self.start(since, until, reason="reconnect")
+        logger.info(f"🔄 Started catch-up backfill {job_id} for the reconnect gap")
+
+    async def on_poll(self):
+        """
+        Live poll hook. The live path only asks for the current UTC day, so when
+        the day rolls over, the previous day's tail since the last poll is
+        backfilled for the executions that were running across midnight.
+        """
+        now = datetime.now(timezone.utc)
+        previous, self._last_poll_at = self._last_poll_at, now
+        if previous is None or previous.date() == now.date():
+            return
+        midnight = now.replace(hour=0, minute=0, second=0, microsecond=0)
+        job_id = await self.start(previous, midnight - timedelta(microseconds=1), reason="day rollover")
+        logger.info(f"🌙 Started backfill {job_id} for the tail of {previous.date()}")
+
+    async def resume_pending(self):
+        async for job in db.backfill_jobs.find({"status": "running"}, {"_id": 1}):
+            logger.info(f"🔄 Resuming backfill {job['_id']}")
+            self._launch(str(job["_id"]))
+
+    def _launch(self, job_id):
+        if job_id not in self._tasks or self._tasks[job_id].done():
+            self._tasks[job_id] = asyncio.create_task(self._run_job(job_id))
+
+    def snapshot(self, job_id) -> dict:
+        p = self.progress.get(job_id)
+        if not p:
+            return None
+        elapsed = time.monotonic() - p["started"]
+        return {
+            "units_total": p["units_total"],
+            "units_done": p["units_done"],
+            "remaining_units": p["units_total"] - p["units_done"],
+            "logs_received": p["logs"],
+            "logs_per_sec": round(p["logs"] / elapsed, 2) if elapsed > 0 else 0.0,
+            "running": job_id in self._tasks and not self._tasks[job_id].done(),
+        }
+
+    # ---------------------------
+    # Work
+    # ---------------------------
+    async def _plan(self, since, until):
+        """(ExecutionId, [days]) for executions that ran inside [since, until]."""
+        since, until = to_utc(since), to_utc(until)
+        # StartTime/EndTime are stored as the hub's ISO strings: narrow by day in
+        # Mongo, then compare exactly below
+        query = {
+            "StartTime": {"$type": "string", "$lt": (until + timedelta(days=1)).date().isoformat()},
+            "$or": [
+                {"EndTime": {"$gte": (since - timedelta(days=1)).date().isoformat()}},
+                {"EndTime": {"$in": [None, ""]}},
+            ],
+        }
+        plan, skipped = [], 0
+        async for e in db.executions.find(query, {"ExecutionId": 1, "StartTime": 1, "EndTime": 1}):
+            start = parse_hub_time(e.get("StartTime"))
+            end = parse_hub_time(e.get("EndTime")) if e.get("EndTime") else until  # still running
+            if start is None or end is None:
+                skipped += 1
+                continue
+            if start > until or end < since:
+                continue
+            days = list(day_windows(max(start, since), min(end, until)))
+            plan.append((e["ExecutionId"], days))
+        if skipped:
+            logger.warning(f"⚠ Backfill skipped {skipped} executions with unparseable StartTime/EndTime")
+        return plan
+
+    async def _run_job(self, job_id):
+        job = await db.backfill_jobs.find_one({"_id": ObjectId(job_id)})
+        done = set(job.get("done_units", []))
+        plan = await self._plan(job["since"], job["until"])
+        units_total = sum(len(days) for _, days in plan)
+        await db.backfill_jobs.update_one({"_id": job["_id"]}, {"$set": {"units_total": units_total}})
+
+        self.progress[job_id] = {
+            "units_total": units_total,
+            "units_done": len(done),
+            "logs": 0,
+            "started": time.monotonic(),
+        }
+        logger.info(f"📦 Backfill {job_id}: {len(plan)} executions, {units_total} day windows ({len(done)} already done)")
+
+        try:
+            async with _BackfillSession() as session:
+                semaphore = asyncio.Semaphore(BACKFILL_CONCURRENCY)
+
+                async def backfill_execution(exec_id, days):
+                    async with semaphore:
+                        for day in days:
+                            unit = f"{exec_id}|{day.isoformat()}"
+                            if unit in done:
+                                continue
+                            received = await session.fetch_day(exec_id, day)
+                            await log_writer.flush()
+                            self.progress[job_id]["units_done"] += 1
+                            self.progress[job_id]["logs"] += received
+                            await db.backfill_jobs.update_one(
+                                {"_id": job["_id"]},
+                                {
+                                    "$addToSet": {"done_units": unit},
+                                    "$inc": {"units_done": 1, "logs_received": received},
+                                    "$set": {"UpdatedAt": datetime.now(timezone.utc)},
+                                }
+                            )
+
+                await asyncio.gather(*(backfill_execution(e, days) for e, days in plan))
+
+            await db.backfill_jobs.update_one(
+                {"_id": job["_id"]},
+                {"$set": {"status": "completed", "UpdatedAt": datetime.now(timezone.utc)}}
+            )
+            logger.info(f"✅ Backfill {job_id} completed: {self.snapshot(job_id)}")
+        except Exception as e:
+            # Left as 'running' so resume_pending picks it up after a restart
+            logger.error(f"⚠ Backfill {job_id} interrupted: {e}", exc_info=True)
+            await db.backfill_jobs.update_one(
+                {"_id": job["_id"]},
+                {"$set": {"last_error": str(e), "UpdatedAt": datetime.now(timezone.utc)}}
+            )
+
+
+class _BackfillSession:
+    """Dedicated hub connection that counts the log rows pushed per execution."""
+
+    def __init__(self):
+        self.hub = HubClient()
+        self._rows = {}
+
+    async def __aenter__(self):
+        access_token = await get_token()
+        connection_token = await negotiate_connection(access_token)
+        await self.hub.connect(access_token, connection_token)
+        self.hub.on("viewLogExecution", self._on_logs)
+        self.hub.start()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.hub.close()
+
+    async def _on_logs(self, args):
+        data = args[0]["Data"]
+        if data:
+            exec_id = data[0]["ExecutionID"]
+            self._rows[exec_id] = self._rows.get(exec_id, 0) + len(data)
+            await log_writer.add(data)
+
+    async def fetch_day(self, exec_id, day) -> int:
+        """Fetch every page of one execution's logs for one day; returns rows received."""
+        total, page = 0, 0
+        while True:
+            before = self._rows.get(exec_id, 0)
+            await self.hub.invoke(
+                "ViewLogExecution",
+                [exec_id, page, BACKFILL_PAGE_SIZE, day.day, day.month, day.year, ""],
+                timeout=BACKFILL_REQUEST_TIMEOUT,
+            )
+            received = self._rows.get(exec_id, 0) - before
+            total += received
+            if received < BACKFILL_PAGE_SIZE:
+                return total
+            page += 1
+
+
+log_backfill = LogBackfill()
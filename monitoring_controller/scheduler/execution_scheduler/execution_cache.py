@@ -0,0 +1,79 @@
+import os
+import json
+import hashlib
+import logging
+from collections import OrderedDict
+from db_connection.database import db
+
+logger = logging.getLogger(__name__)
+
+EXECUTION_CACHE_SIZE = int(os.getenv("EXECUTION_CACHE_SIZE", 10000))
+# Fields Mongo adds to stored executions; hub payloads never carry them
+STORAGE_FIELDS = {"_id", "IngestedAt"}
+
+
+def document_hash(doc) -> str:
+    """Stable hash of a document, independent of key order and storage-only fields."""
+    body = {k: v for k, v in doc.items() if k not in STORAGE_FIELDS}
+    encoded = json.dumps(body, sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.blake2b(encoded.encode("utf-8"), digest_size=16).hexdigest()
+
+
+class ExecutionHashCache:
+    """
+    Bounded LRU of ExecutionId -> hash of the last persisted execution.
+    `filter_changed` drops executions whose payload matches what is already
+    in Mongo, so the 30-second ViewExecution refresh stops rewriting them.
+    """
+
+    def __init__(self, collection, max_size: int = EXECUTION_CACHE_SIZE):
+        self.collection = collection
+        self.max_size = max_size
+        self._hashes = OrderedDict()
+        self.stats = {"lookups": 0, "hits": 0, "skipped": 0, "evictions": 0}
+
+    async def load(self):
+        """Warm the cache with the most recently stored executions."""
+        cursor = self.collection.find({}).sort("_id", -1).limit(self.max_size)
+        async for doc in cursor:
+            self._hashes[doc["ExecutionId"]] = document_hash(doc)
+        # Oldest first so LRU eviction order matches recency
+        self._hashes = OrderedDict(reversed(list(self._hashes.items())))
+        logger.info(f"✔ Warmed execution hash cache with {len(self._hashes)} executions")
+
+    def filter_changed(self, executions):
+        """Return only the executions whose content differs from the cached hash."""
+        changed = []
+        for e in executions:
+            self.stats["lookups"] += 1
+            cached = self._hashes.get(e["ExecutionId"])
+            if cached is not None:
+                self.stats["hits"] += 1
+                self._hashes.move_to_end(e["ExecutionId"])
+                if cached == document_hash(e):
+                    self.stats["skipped"] += 1
+                    continue
+            changed.append(e)
+        return changed
+
+    async def remember(self, executions):
+        """IngestWriter on_flush hook: cache hashes of the rows just written."""
+        for e in executions:
+            self._hashes[e["ExecutionId"]] = document_hash(e)
+            self._hashes.move_to_end(e["ExecutionId"])
+        while len(self._hashes) > self.max_size:
+            self._hashes.popitem(last=False)
+            self.stats["evictions"] += 1
+
+    def snapshot(self) -> dict:
+        lookups = self.stats["lookups"]
+        return {
+            **self.stats,
+            "size": len(self._hashes),
+            "max_size": self.max_size,
+            "hit_ratio": round(self.stats["hits"] / lookups, 4) if lookups else 0.0,
+            "skip_ratio": round(self.stats["skipped"] / lookups, 4) if lookups else 0.0,
+        }
+
+
+execution_cache = ExecutionHashCache(db.executions)
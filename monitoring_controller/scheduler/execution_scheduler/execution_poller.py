@@ -0,0 +1,120 @@
+import os
+import logging
+from db_connection.database import load_state, save_state
+from scheduler.execution_scheduler.log_watermarks import TERMINAL_STATES
+from scheduler.execution_scheduler.backfill import parse_hub_time
+
+logger = logging.getLogger(__name__)
+
+# -------------------------------
+# Config
+# -------------------------------
+EXECUTION_PAGE_SIZE = int(os.getenv("EXECUTION_PAGE_SIZE", 50))
+EXECUTION_MAX_IN_FLIGHT = int(os.getenv("EXECUTION_MAX_IN_FLIGHT", 4))
+# Safety cap on pages walked in one poll cycle
+EXECUTION_MAX_PAGES = int(os.getenv("EXECUTION_MAX_PAGES", 200))
+
+CURSOR_KEY = "execution_cursor"
+
+
+class ExecutionPoller:
+    """
+    Walks ViewExecution pages (newest first) with a bounded number of page
+    requests in flight.
+
+    A cycle starts at page 0 and keeps paging while a full page still holds
+    executions newer than the stored cursor (highest `Id` / `StartTime` seen)
+    or executions known to be running that have not been refreshed yet. The
+    search for running executions stops at the first page that is older than
+    the oldest of them, and one that is still not found when the cycle ends
+    has left the hub listing and is no longer tracked. In steady state that
+    is a single page per cycle.
+    """
+
+    def __init__(self, page_size: int = EXECUTION_PAGE_SIZE,
+                 max_in_flight: int = EXECUTION_MAX_IN_FLIGHT,
+                 max_pages: int = EXECUTION_MAX_PAGES):
+        self.page_size = page_size
+        self.max_in_flight = max_in_flight
+        self.max_pages = max_pages
+        self.cursor = {"Id": 0, "StartTime": None}
+        self._send_page = None
+        # Running ExecutionId -> StartTime (aware UTC, or None if unknown)
+        self._running = {}
+        self._cycle_active = False
+        self._cycle_floor = 0
+        self._cycle_seen = set()
+        self._next_page = 0
+        self._in_flight = 0
+        self.stats = {"cycles": 0, "pages_requested": 0, "pages_received": 0, "last_cycle_pages": 0}
+
+    async def load(self):
+        self.cursor = await load_state(CURSOR_KEY, self.cursor)
+        logger.info(f"✔ Execution cursor: Id={self.cursor['Id']} StartTime={self.cursor['StartTime']}")
+
+    async def poll(self, send_page):
+        """Start a poll cycle; `send_page(page, page_size)` sends one ViewExecution request."""
+        self._send_page = send_page
+        self._cycle_active = True
+        self._cycle_floor = self.cursor["Id"]
+        self._cycle_seen = set()
+        self._next_page = 0
+        self._in_flight = 0
+        self.stats["cycles"] += 1
+        self.stats["last_cycle_pages"] = 0
+        await self._fill_window(1)
+
+    async def on_page(self, executions):
+        """Handle one received ViewExecution page and request more if needed."""
+        self.stats["pages_received"] += 1
+        self._in_flight = max(0, self._in_flight - 1)
+
+        for e in executions:
+            self._cycle_seen.add(e["ExecutionId"])
+            if e.get("State") in TERMINAL_STATES:
+                self._running.pop(e["ExecutionId"], None)
+            else:
+                self._running[e["ExecutionId"]] = parse_hub_time(e.get("StartTime"))
+
+        newest = max(executions, key=lambda e: e.get("Id") or 0, default=None)
+        if newest and (newest.get("Id") or 0) > self.cursor["Id"]:
+            self.cursor = {"Id": newest["Id"], "StartTime": newest.get("StartTime")}
+            await save_state(CURSOR_KEY, self.cursor)
+
+        if not self._cycle_active:
+            return
+
+        has_new = any((e.get("Id") or 0) > self._cycle_floor for e in executions)
+        if len(executions) >= self.page_size and (has_new or self._looking_for_running(executions)):
+            await self._fill_window(self.max_in_flight)
+        elif self._in_flight == 0:
+            self._cycle_active = False
+            missing = set(self._running) - self._cycle_seen
+            for exec_id in missing:
+                del self._running[exec_id]
+            if missing:
+                logger.info(f"🧹 Stopped tracking {len(missing)} running executions missing from the hub listing")
+            logger.info(f"✔ Execution poll cycle done after {self.stats['last_cycle_pages']} page(s)")
+
+    def _looking_for_running(self, executions) -> bool:
+        """Whether running executions not seen this cycle could still be on later pages."""
+        unrefreshed = [self._running[i] for i in set(self._running) - self._cycle_seen]
+        if not unrefreshed:
+            return False
+        if None in unrefreshed:
+            return True
+        # Pages are newest first: once a page reaches back past the oldest one, later pages cannot hold it
+        page_times = [t for t in (parse_hub_time(e.get("StartTime")) for e in executions) if t]
+        return not page_times or min(page_times) >= min(unrefreshed)
+
+    async def _fill_window(self, window):
+        while self._in_flight < window and self._next_page < self.max_pages:
+            page = self._next_page
+            self._next_page += 1
+            self._in_flight += 1
+            self.stats["pages_requested"] += 1
+            self.stats["last_cycle_pages"] += 1
+            await self._send_page(page, self.page_size)
+
+
+execution_poller = ExecutionPoller()
@@ -0,0 +1,133 @@
+import os
+import time
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+# -------------------------------
+# Config
+# -------------------------------
+INGEST_QUEUE_SIZE = int(os.getenv("INGEST_QUEUE_SIZE", 1000))
+INGEST_WORKERS = int(os.getenv("INGEST_WORKERS", 4))
+# Hub fetches resume once the queue drops below this fraction of its size
+INGEST_RESUME_RATIO = float(os.getenv("INGEST_RESUME_RATIO", 0.5))
+# Seconds `stop` waits for the writers to drain before discarding the rest
+INGEST_STOP_TIMEOUT = float(os.getenv("INGEST_STOP_TIMEOUT", 10))
+
+
+class IngestPipeline:
+    """
+    Bounded producer/consumer queue between the WebSocket receiver and Mongo.
+
+    The receiver only parses frames and calls `put`; `workers` tasks started
+    by `start(handler)` drain the queue through `handler(target, data)`.
+    Nothing is dropped while running: a full queue blocks `put`, and `wait_for_capacity`
+    lets hub fetches pause until the writers have caught up. Once `stop` has
+    begun, `stopping` is set and hub fetches must not be sent.
+    """
+
+    def __init__(self, maxsize: int = INGEST_QUEUE_SIZE, workers: int = INGEST_WORKERS):
+        self.handler = None
+        self.maxsize = maxsize
+        self.workers = workers
+        self.queue = asyncio.Queue(maxsize=maxsize)
+        self._has_capacity = asyncio.Event()
+        self._has_capacity.set()
+        self._tasks = []
+        self.stopping = False
+        self._rate_sample = (time.monotonic(), 0)
+        self.stats = {
+            "enqueued": 0,
+            "drained": 0,
+            "failed": 0,
+            "enqueue_wait_ms_total": 0.0,
+            "enqueue_wait_ms_max": 0.0,
+            "fetch_pauses": 0,
+            "discarded": 0,
+        }
+
+    def start(self, handler):
+        self.handler = handler
+        self.stopping = False
+        self._tasks = [asyncio.create_task(self._worker(i)) for i in range(self.workers)]
+        logger.info(f"🧵 Started {self.workers} ingest writers (queue size={self.maxsize})")
+
+    async def stop(self, timeout: float = INGEST_STOP_TIMEOUT):
+        """
+        Give the writers up to `timeout` seconds to finish what is queued, then
+        stop them. Anything left is discarded; the watermarks have not moved
+        past it, so the next connection fetches it again.
+        """
+        self.stopping = True
+        # Wake fetches paused on backpressure so they see `stopping` and return
+        self._has_capacity.set()
+        try:
+            await asyncio.wait_for(self.queue.join(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"⚠ Ingest queue not drained within {timeout}s, discarding {self.queue.qsize()} payloads")
+        finally:
+            for task in self._tasks:
+                task.cancel()
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+            self._tasks = []
+            while not self.queue.empty():
+                self.queue.get_nowait()
+                self.queue.task_done()
+                self.stats["discarded"] += 1
+
+    async def put(self, target, data):
+        started = time.perf_counter()
+        await self.queue.put((target, data))
+        wait_ms = (time.perf_counter() - started) * 1000
+
+        self.stats["enqueued"] += 1
+        self.stats["enqueue_wait_ms_total"] += wait_ms
+        self.stats["enqueue_wait_ms_max"] = max(self.stats["enqueue_wait_ms_max"], wait_ms)
+        if self.queue.full() and self._has_capacity.is_set():
+            self._has_capacity.clear()
+            self.stats["fetch_pauses"] += 1
+            logger.warning("⏸ Ingest queue full, pausing hub fetches")
+
+    async def wait_for_capacity(self):
+        """Await before sending a hub request so a backlog is not made worse."""
+        await self._has_capacity.wait()
+
+    async def _worker(self, index):
+        while True:
+            target, data = await self.queue.get()
+            try:
+                await self.handler(target, data)
+                self.stats["drained"] += 1
+            except Exception as e:
+                self.stats["failed"] += 1
+                logger.error(f"⚠ Ingest writer {index} failed on '{target}': {e}", exc_info=True)
+            finally:
+                self.queue.task_done()
+                if (not self._has_capacity.is_set()
+                        and self.queue.qsize() <= self.maxsize * INGEST_RESUME_RATIO):
+                    self._has_capacity.set()
+                    logger.info("▶ Ingest queue drained, resuming hub fetches")
+
+    def snapshot(self) -> dict:
+        """Current queue metrics; drain rate is measured since the previous snapshot."""
+        now = time.monotonic()
+        sampled_at, sampled_drained = self._rate_sample
+        elapsed = now - sampled_at
+        drain_rate = (self.stats["drained"] - sampled_drained) / elapsed if elapsed > 0 else 0.0
+        self._rate_sample = (now, self.stats["drained"])
+
+        enqueued = self.stats["enqueued"]
+        return {
+            **self.stats,
+            "depth": self.queue.qsize(),
+            "maxsize": self.maxsize,
+            "workers": self.workers,
+            "paused": not self._has_capacity.is_set(),
+            "stopping": self.stopping,
+            "enqueue_wait_ms_avg": round(self.stats["enqueue_wait_ms_total"] / enqueued, 3) if enqueued else 0.0,
+            "drain_rate_per_sec": round(drain_rate, 2),
+        }
+
+
+ingest_pipeline = IngestPipeline()
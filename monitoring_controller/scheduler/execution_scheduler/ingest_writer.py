@@ -0,0 +1,220 @@
+import os
+import time
+import asyncio
+import logging
+from datetime import datetime, timezone
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+from db_connection.database import db
+from db_connection.log_store import LOG_STORAGE, logs_collection, to_storage
+from scheduler.execution_scheduler.log_watermarks import log_watermarks
+from scheduler.execution_scheduler.execution_cache import execution_cache
+
+logger = logging.getLogger(__name__)
+
+# -------------------------------
+# Config
+# -------------------------------
+INGEST_BATCH_SIZE = int(os.getenv("INGEST_BATCH_SIZE", 500))
+INGEST_FLUSH_INTERVAL = float(os.getenv("INGEST_FLUSH_INTERVAL", 1.0))
+# Times a row that keeps failing is requeued before it is dropped
+INGEST_MAX_RETRIES = int(os.getenv("INGEST_MAX_RETRIES", 5))
+
+
+class IngestWriter:
+    """
+    Buffers hub payload rows for one collection and writes them as
+    unordered bulk upserts keyed on `key_field`.
+    Rows with the same key inside a batch are merged, so ordered=False is safe.
+    `prepare(row)` shapes a row for storage; `on_flush` still gets the raw rows,
+    and only those that were written: rows rejected by the bulk write are
+    requeued for the next flush instead.
+    """
+
+    def __init__(self, collection, key_field: str,
+                 batch_size: int = INGEST_BATCH_SIZE,
+                 flush_interval: float = INGEST_FLUSH_INTERVAL,
+                 on_flush=None, prepare=None):
+        self.collection = collection
+        self.key_field = key_field
+        self.prepare = prepare
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.on_flush = on_flush
+        self._pending = {}
+        self._retries = {}
+        self._lock = asyncio.Lock()
+        self.stats = {
+            "batches": 0,
+            "rows": 0,
+            "upserted": 0,
+            "modified": 0,
+            "unchanged": 0,
+            "errors": 0,
+            "requeued": 0,
+            "dropped": 0,
+            "last_batch_size": 0,
+            "last_batch_latency_ms": 0.0,
+            "total_latency_ms": 0.0,
+        }
+
+    async def add(self, rows):
+        """Queue rows for upsert; flushes straight away once a batch is full."""
+        for row in rows:
+            key = row[self.key_field]
+            if key in self._pending:
+                self._pending[key].update(row)
+            else:
+                self._pending[key] = dict(row)
+
+        if len(self._pending) >= self.batch_size:
+            await self.flush()
+
+    async def flush(self):
+        """Write every pending row, batch_size operations per bulk_write call."""
+        async with self._lock:
+            failed = []
+            try:
+                while self._pending:
+                    keys = list(self._pending)[:self.batch_size]
+                    batch = [self._pending.pop(k) for k in keys]
+                    try:
+                        failed_at = await self._write_batch(batch)
+                    except Exception:
+                        # Put the batch back so the next flush retries it
+                        for row in batch:
+                            self._pending.setdefault(row[self.key_field], row)
+                        raise
+                    if failed_at:
+                        failed.extend(batch[i] for i in failed_at)
+                        batch = [row for i, row in enumerate(batch) if i not in failed_at]
+                    if self._retries:
+                        for row in batch:
+                            self._retries.pop(row[self.key_field], None)
+                    if self.on_flush and batch:
+                        try:
+                            await self.on_flush(batch)
+                        except Exception as e:
+                            logger.error(f"⚠ on_flush hook failed for '{self.collection.name}': {e}", exc_info=True)
+            finally:
+                # Retried on the next flush, not in this loop
+                self._requeue(failed)
+
+    def _requeue(self, rows):
+        for row in rows:
+            key = row[self.key_field]
+            attempts = self._retries.get(key, 0) + 1
+            if attempts > INGEST_MAX_RETRIES:
+                self._retries.pop(key, None)
+                self.stats["dropped"] += 1
+                logger.error(f"⚠ Dropping {self.key_field}={key} after {INGEST_MAX_RETRIES} failed writes")
+                continue
+            self._retries[key] = attempts
+            self._pending.setdefault(key, row)
+            self.stats["requeued"] += 1
+
+    async def _write_batch(self, batch) -> set:
+        """Write one batch; returns the indexes of the rows that failed."""
+        docs = [self.prepare(row) for row in batch] if self.prepare else batch
+        ops = [
+            UpdateOne({self.key_field: doc[self.key_field]}, {"$set": doc}, upsert=True)
+            for doc in docs
+        ]
+        started = time.perf_counter()
+        failed_at = set()
+        try:
+            result = await self.collection.bulk_write(ops, ordered=False)
+            upserted = result.upserted_count
+            matched = result.matched_count
+            modified = result.modified_count
+        except BulkWriteError as e:
+            details = e.details
+            upserted = details.get("nUpserted", 0)
+            matched = details.get("nMatched", 0)
+            modified = details.get("nModified", 0)
+            failed_at = {err["index"] for err in details.get("writeErrors", [])}
+            self.stats["errors"] += len(failed_at)
+            logger.error(f"⚠ Bulk write errors on '{self.collection.name}': {details.get('writeErrors')}")
+        latency_ms = (time.perf_counter() - started) * 1000
+
+        self.stats["upserted"] += upserted
+        self.stats["modified"] += modified
+        self.stats["unchanged"] += matched - modified
+        self._record(len(batch), latency_ms)
+
+        logger.info(
+            f"💾 {self.collection.name}: {len(batch)} rows in {latency_ms:.1f} ms "
+            f"(upserted={upserted}, modified={modified}, unchanged={matched - modified})"
+        )
+        return failed_at
+
+    def _record(self, rows, latency_ms):
+        self.stats["batches"] += 1
+        self.stats["rows"] += rows
+        self.stats["last_batch_size"] = rows
+        self.stats["last_batch_latency_ms"] = round(latency_ms, 2)
+        self.stats["total_latency_ms"] += latency_ms
+
+    async def run(self):
+        """Flush on a timer so small trickles do not wait for a full batch."""
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"⚠ Error flushing '{self.collection.name}': {e}", exc_info=True)
+
+
+class TimeSeriesWriter(IngestWriter):
+    """
+    Insert-only variant for time-series collections, which cannot be upserted
+    or carry unique indexes. Keys already stored are looked up per batch and
+    skipped, so re-fetched pages (reconnect catch-up, backfill) are not
+    written twice.
+    """
+
+    async def _write_batch(self, batch) -> set:
+        started = time.perf_counter()
+        keys = [row[self.key_field] for row in batch]
+        existing = {
+            doc[self.key_field]
+            async for doc in self.collection.find({self.key_field: {"$in": keys}}, {self.key_field: 1, "_id": 0})
+        }
+        # Batch index of each document, to map insert errors back to rows
+        positions = [i for i, row in enumerate(batch) if row[self.key_field] not in existing]
+        docs = [self.prepare(batch[i]) if self.prepare else batch[i] for i in positions]
+        inserted = 0
+        failed_at = set()
+        if docs:
+            try:
+                result = await self.collection.insert_many(docs, ordered=False)
+                inserted = len(result.inserted_ids)
+            except BulkWriteError as e:
+                inserted = e.details.get("nInserted", 0)
+                failed_at = {positions[err["index"]] for err in e.details.get("writeErrors", [])}
+                self.stats["errors"] += len(failed_at)
+                logger.error(f"⚠ Insert errors on '{self.collection.name}': {e.details.get('writeErrors')}")
+        latency_ms = (time.perf_counter() - started) * 1000
+
+        self.stats["upserted"] += inserted
+        self.stats["unchanged"] += len(existing)
+        self._record(len(batch), latency_ms)
+
+        logger.info(
+            f"💾 {self.collection.name}: {len(batch)} rows in {latency_ms:.1f} ms "
+            f"(inserted={inserted}, already stored={len(existing)})"
+        )
+        return failed_at
+
+
+def stamp_ingested(row):
+    """Executions carry the time they were last written, for watermarked scans."""
+    return {**row, "IngestedAt": datetime.now(timezone.utc)}
+
+
+execution_writer = IngestWriter(
+    db.executions, "ExecutionId", on_flush=execution_cache.remember, prepare=stamp_ingested
+)
+log_writer = (TimeSeriesWriter if LOG_STORAGE == "timeseries" else IngestWriter)(
+    logs_collection(), "logid", on_flush=log_watermarks.persist, prepare=to_storage
+)
@@ -0,0 +1,212 @@
+import os
+import time
+import logging
+from collections import OrderedDict
+from datetime import datetime, timezone
+from pymongo import UpdateOne
+from db_connection.database import db
+
+logger = logging.getLogger(__name__)
+
+# Executions in these states will not produce new log lines
+TERMINAL_STATES = {"Successful", "Faulted", "Stopped", "Aborted", "Completed"}
+# A catch-up that has received no page for this long lost a request and is restarted
+LOG_CATCHUP_TIMEOUT = float(os.getenv("LOG_CATCHUP_TIMEOUT", 120))
+# Executions whose marks are kept in memory; the least recently polled idle ones are evicted
+LOG_WATERMARK_CACHE_SIZE = int(os.getenv("LOG_WATERMARK_CACHE_SIZE", 5000))
+
+
+class LogWatermarks:
+    """
+    Tracks the highest stored `logid` per ExecutionId so the ws client only
+    requests and writes logs newer than what is already in Mongo.
+
+    A poll fetches pages newest-first until one reaches the mark (a catch-up).
+    The mark stays at the poll-start floor until that catch-up ends, so a lost
+    page or a crash part way through re-fetches from the old floor. Only then
+    does the in-memory mark advance; the persisted mark in `log_watermarks`
+    follows once every row of the catch-up has been flushed by the log
+    writer, so a restart never skips logs.
+
+    Marks are loaded lazily, one `$in` query per poll for the executions not
+    yet in memory, and at most LOG_WATERMARK_CACHE_SIZE idle executions are
+    kept; an evicted one is simply read back from Mongo when polled again.
+    """
+
+    def __init__(self, collection):
+        self.collection = collection
+        self._marks = OrderedDict()
+        self._catchups = {}
+        self._chains = {}
+        self._pages = {}
+        self._unflushed = {}
+        self._targets = {}
+        self._drained = set()
+        self._terminal = set()
+        self._awaiting_drain = set()
+        self._responded_empty = set()
+
+    async def load(self, exec_ids):
+        """Read the marks of executions not in memory yet, and mark all as recently used."""
+        missing = [i for i in exec_ids if i not in self._marks]
+        if missing:
+            for exec_id in missing:
+                self._marks[exec_id] = 0
+            async for doc in self.collection.find({"ExecutionId": {"$in": missing}}):
+                exec_id = doc["ExecutionId"]
+                self._marks[exec_id] = max(self._marks.get(exec_id, 0), doc.get("last_logid", 0))
+                # A drained execution that started running again is polled as usual
+                if doc.get("drained") and exec_id in self._terminal:
+                    self._drained.add(exec_id)
+        for exec_id in exec_ids:
+            self._marks.move_to_end(exec_id)
+        self._evict()
+
+    def _evict(self):
+        excess = len(self._marks) - LOG_WATERMARK_CACHE_SIZE
+        if excess <= 0:
+            return
+        # Executions with a catch-up or unflushed rows in progress stay
+        victims = []
+        for exec_id in self._marks:
+            if len(victims) >= excess:
+                break
+            if exec_id not in self._catchups and not self._unflushed.get(exec_id) and exec_id not in self._targets:
+                victims.append(exec_id)
+        for exec_id in victims:
+            del self._marks[exec_id]
+            self._chains.pop(exec_id, None)
+            self._unflushed.pop(exec_id, None)
+            for ids in (self._drained, self._terminal, self._awaiting_drain, self._responded_empty):
+                ids.discard(exec_id)
+
+    def get(self, exec_id) -> int:
+        return self._marks.get(exec_id, 0)
+
+    def observe_executions(self, executions):
+        """Record execution states; a non-terminal execution is never drained."""
+        for e in executions:
+            exec_id = e["ExecutionId"]
+            if e.get("State") in TERMINAL_STATES:
+                self._terminal.add(exec_id)
+            else:
+                self._terminal.discard(exec_id)
+                self._drained.discard(exec_id)
+                self._responded_empty.discard(exec_id)
+
+    def filter_new(self, rows):
+        """
+        Return rows above the mark and record them against the running
+        catch-up. The mark itself does not move until `end_catchup`.
+        """
+        new_rows = [row for row in rows if row["logid"] > self._marks.get(row["ExecutionID"], 0)]
+        if rows:
+            self._pages[rows[0]["ExecutionID"]] = (len(rows), len(new_rows))
+        now = time.monotonic()
+        for row in new_rows:
+            exec_id = row["ExecutionID"]
+            catchup = self._catchups.setdefault(exec_id, {"high": 0})
+            catchup["high"] = max(catchup["high"], row["logid"])
+            catchup["seen"] = now
+            self._unflushed.setdefault(exec_id, set()).add(row["logid"])
+            self._responded_empty.discard(exec_id)
+        return new_rows
+
+    def take_page(self, exec_id):
+        """(rows, new rows) of the last page received for an execution; (0, 0) if it was empty."""
+        return self._pages.pop(exec_id, (0, 0))
+
+    def responded(self, exec_id, new_rows: int):
+        """
+        The page 0 of this poll has been received and processed. Only such a
+        response, carrying no new rows, counts toward draining; a request
+        still waiting on ingest backpressure does not.
+        """
+        if exec_id not in self._awaiting_drain:
+            return
+        self._awaiting_drain.discard(exec_id)
+        if new_rows == 0 and exec_id not in self._catchups:
+            self._responded_empty.add(exec_id)
+
+    def chain(self, exec_id) -> int:
+        """Id of the current catch-up; requests of a superseded one are dropped."""
+        return self._chains.get(exec_id, 0)
+
+    async def end_catchup(self, exec_id):
+        """The catch-up reached the mark: every newer row has been received."""
+        catchup = self._catchups.pop(exec_id, None)
+        if catchup is None:
+            return
+        self._marks[exec_id] = max(self._marks.get(exec_id, 0), catchup["high"])
+        self._targets[exec_id] = max(self._targets.get(exec_id, 0), catchup["high"])
+        if not self._unflushed.get(exec_id):
+            await self._save({exec_id: self._targets.pop(exec_id)})
+
+    async def before_poll(self, exec_ids):
+        """
+        Called before a poll cycle. A terminal execution whose previous poll
+        got its page 0 back with no new rows is drained and is not polled again.
+        """
+        await self.load(exec_ids)
+        drained_now = [
+            i for i in exec_ids
+            if i in self._terminal and i in self._responded_empty
+        ]
+        if drained_now:
+            self._drained.update(drained_now)
+            self._responded_empty.difference_update(drained_now)
+            await self.collection.bulk_write([
+                UpdateOne(
+                    {"ExecutionId": i},
+                    {"$set": {"drained": True, "UpdatedAt": datetime.now(timezone.utc)}},
+                    upsert=True,
+                )
+                for i in drained_now
+            ], ordered=False)
+            logger.info(f"🏁 Stopped polling drained executions: {drained_now}")
+
+        # A catch-up still receiving pages is left to finish; a stalled one restarts from page 0
+        now = time.monotonic()
+        busy = {
+            i for i in exec_ids
+            if i in self._catchups and now - self._catchups[i].get("seen", 0) < LOG_CATCHUP_TIMEOUT
+        }
+        to_poll = [i for i in exec_ids if i not in self._drained and i not in busy]
+        for i in to_poll:
+            self._chains[i] = self._chains.get(i, 0) + 1
+            if i in self._catchups:
+                logger.warning(f"⚠ Log catch-up for {i} stalled, restarting it from the mark")
+        self._responded_empty.difference_update(to_poll)
+        self._awaiting_drain.difference_update(to_poll)
+        self._awaiting_drain.update(i for i in to_poll if i in self._terminal)
+        return to_poll
+
+    async def persist(self, rows):
+        """IngestWriter on_flush hook: persist marks whose catch-up rows are all flushed."""
+        for row in rows:
+            pending = self._unflushed.get(row["ExecutionID"])
+            if pending:
+                pending.discard(row["logid"])
+        settled = {}
+        for exec_id in {row["ExecutionID"] for row in rows}:
+            if not self._unflushed.get(exec_id):
+                self._unflushed.pop(exec_id, None)
+                if exec_id in self._targets:
+                    settled[exec_id] = self._targets.pop(exec_id)
+        await self._save(settled)
+
+    async def _save(self, marks):
+        if not marks:
+            return
+        now = datetime.now(timezone.utc)
+        await self.collection.bulk_write([
+            UpdateOne(
+                {"ExecutionId": exec_id},
+                {"$max": {"last_logid": logid}, "$set": {"UpdatedAt": now}},
+                upsert=True,
+            )
+            for exec_id, logid in marks.items()
+        ], ordered=False)
+
+
+log_watermarks = LogWatermarks(db.log_watermarks)
@@ -0,0 +1,126 @@
+import os
+import time
+import asyncio
+import logging
+from scheduler.execution_scheduler.ws_client import run_ws_client
+from scheduler.execution_scheduler.utils.apis import get_token, negotiate_connection
+from scheduler.execution_scheduler.utils.reconnect import Reconnector
+
+logger = logging.getLogger(__name__)
+
+# -------------------------------
+# Config
+# -------------------------------
+RECONNECT_BASE_DELAY = float(os.getenv("HUB_RECONNECT_BASE_DELAY", 1.0))
+RECONNECT_MAX_DELAY = float(os.getenv("HUB_RECONNECT_MAX_DELAY", 120.0))
+# Treat the socket as dead if no frame (SignalR pings included) arrives for this long
+FRAME_TIMEOUT = float(os.getenv("HUB_FRAME_TIMEOUT", 90))
+WATCHDOG_INTERVAL = 5
+
+
+class HubSupervisor:
+    """
+    Keeps the hub ws client alive: logs in, negotiates and connects, watches
+    for a closed socket, a silent socket or an expiring token, and reconnects
+    with jittered exponential backoff. After every reconnect the registered
+    catch-up hooks are called with the (disconnected_at, reconnected_at) gap.
+    """
+
+    def __init__(self):
+        self._catch_up_hooks = []
+        self._reconnect = Reconnector(RECONNECT_BASE_DELAY, RECONNECT_MAX_DELAY)
+        self._last_frame_at = None
+        self._disconnected_at = None
+        self.stats = {
+            "connected": False,
+            "reconnects": 0,
+            "failed_attempts": 0,
+            "total_downtime_s": 0.0,
+            "last_disconnect_reason": None,
+        }
+
+    def on_reconnect(self, hook):
+        """Register `async hook(since, until)` to fill the gap after a reconnect."""
+        self._catch_up_hooks.append(hook)
+
+    def mark_frame(self):
+        self._last_frame_at = time.time()
+
+    async def run(self):
+        while True:
+            try:
+                access_token = await get_token()
+                connection_token = await negotiate_connection(access_token)
+                self._reconnect.token_acquired(access_token)
+                await self._run_connection(access_token, connection_token)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.stats["failed_attempts"] += 1
+                self.stats["last_disconnect_reason"] = str(e) or type(e).__name__
+                logger.error(f"⚠ Hub connection lost: {e}")
+
+            self.stats["connected"] = False
+            if self._disconnected_at is None:
+                self._disconnected_at = time.time()
+
+            delay = self._reconnect.next_delay()
+            logger.info(f"🔁 Reconnecting to hub in {delay:.1f}s (attempt {self._reconnect.attempt})")
+            await asyncio.sleep(delay)
+
+    async def _run_connection(self, access_token, connection_token):
+        self.mark_frame()
+        client = asyncio.create_task(
+            run_ws_client(access_token, connection_token,
+                          on_connected=self._connected, on_frame=self.mark_frame)
+        )
+        watchdog = asyncio.create_task(self._watchdog())
+
+        done, _ = await asyncio.wait({client, watchdog}, return_when=asyncio.FIRST_COMPLETED)
+        for task in (client, watchdog):
+            if task not in done:
+                task.cancel()
+        await asyncio.gather(client, watchdog, return_exceptions=True)
+
+        if client in done and client.exception():
+            raise client.exception()
+        self.stats["last_disconnect_reason"] = watchdog.result() if watchdog in done else "client exited"
+        logger.warning(f"🔌 Hub connection closed: {self.stats['last_disconnect_reason']}")
+
+    def _connected(self):
+        """Called by the ws client once the SignalR handshake has been sent."""
+        self.stats["connected"] = True
+        self._reconnect.connected()
+        if self._disconnected_at is None:
+            return
+
+        since, until = self._disconnected_at, time.time()
+        self._disconnected_at = None
+        self.stats["reconnects"] += 1
+        self.stats["total_downtime_s"] += until - since
+        logger.info(f"✔ Hub reconnected after {until - since:.1f}s downtime")
+        for hook in self._catch_up_hooks:
+            asyncio.create_task(hook(since, until))
+
+    async def _watchdog(self):
+        """Return a reason string when the connection should be recycled."""
+        while True:
+            await asyncio.sleep(WATCHDOG_INTERVAL)
+            now = time.time()
+            if self._reconnect.refresh_due():
+                return "token refresh"
+            if now - self._last_frame_at > FRAME_TIMEOUT:
+                return f"no frame for {now - self._last_frame_at:.0f}s"
+
+    def snapshot(self) -> dict:
+        now = time.time()
+        token_expiry = self._reconnect.token_expiry
+        return {
+            **self.stats,
+            "current_downtime_s": round(now - self._disconnected_at, 1) if self._disconnected_at else 0.0,
+            "seconds_since_last_frame": round(now - self._last_frame_at, 1) if self._last_frame_at else None,
+            "token_expires_in_s": round(token_expiry - now) if token_expiry else None,
+        }
+
+
+hub_supervisor = HubSupervisor()
@@ -1,40 +1,142 @@
-import requests
+import os
 import json
+import time
+import base64
+import asyncio
+import aiohttp
+from dotenv import load_dotenv
+load_dotenv()
 
+HUB_API_URL = os.getenv("HUB_API_URL", "https://us01governor.futuredge.com/api")
 NEGOTIATE_URL = (
-    "https://us01governor.futuredge.com/api/myhub/negotiate"
+    f"{HUB_API_URL}/myhub/negotiate"
     "?Machine=WebClient&Key=random&negotiateVersion=1"
 )
+LOGIN_URL = f"{HUB_API_URL}/api/login"
 
-def negotiate_connection(access_token):
-    headers = {
-        "Authorization": access_token,
-        "Accept": "*/*",
-        "Content-Type": "text/plain;charset=UTF-8",
-        "X-Requested-With": "XMLHttpRequest",
-        "x-signalr-user-agent": "Microsoft SignalR/5.0 (5.0.17; Python)"
-    }
-
-    res = requests.post(NEGOTIATE_URL, headers=headers, data="")
-    res.raise_for_status()
-    data = res.json()
-
-    print("✔ Negotiate Success")
-    return data["connectionToken"]
-
-LOGIN_URL = "https://us01governor.futuredge.com/api/api/login"
-
-def get_token():
-    login_body = {
-        "loginType": "RiYSAGovernor",
-        "loginuser": "admin",
-        "pass": "FutureEdge@123",
-        "tenant": "default"
-    }
-
-    res = requests.post(LOGIN_URL, json=login_body)
-    res.raise_for_status()
-    data = res.json()
-
-    print("✔ Login Successful")
-    return "Bearer " + data["token"]
\ No newline at end of file
+HUB_LOGIN_TYPE = os.getenv("HUB_LOGIN_TYPE", "RiYSAGovernor")
+HUB_USER = os.getenv("HUB_USER")
+HUB_PASSWORD = os.getenv("HUB_PASSWORD")
+HUB_TENANT = os.getenv("HUB_TENANT", "default")
+
+# Tokens are refreshed (and hub sockets recycled) this many seconds before expiry,
+# but never more than TOKEN_REFRESH_FRACTION of the token's lifetime
+TOKEN_REFRESH_MARGIN = float(os.getenv("HUB_TOKEN_REFRESH_MARGIN", 300))
+TOKEN_REFRESH_FRACTION = float(os.getenv("HUB_TOKEN_REFRESH_FRACTION", 0.2))
+# A token, and the sockets opened with it, is kept at least this long
+TOKEN_MIN_HOLD = float(os.getenv("HUB_TOKEN_MIN_HOLD", 60))
+HTTP_TIMEOUT = float(os.getenv("HUB_HTTP_TIMEOUT", 15))
+
+
+def get_token_claims(access_token) -> dict:
+    """Decode the JWT claims of a bearer token, or {} if it is not a JWT."""
+    try:
+        payload = access_token.replace("Bearer ", "").split(".")[1]
+        payload += "=" * (-len(payload) % 4)
+        return json.loads(base64.urlsafe_b64decode(payload))
+    except Exception:
+        return {}
+
+
+def get_token_expiry(access_token):
+    """Return the JWT `exp` claim (epoch seconds) of a bearer token, or None."""
+    return get_token_claims(access_token).get("exp")
+
+
+def token_refresh_at(access_token, now: float = None):
+    """
+    Epoch seconds at which a token should be replaced, or None when it has no
+    `exp`. Short-lived tokens get a proportionally smaller margin, and nothing
+    is refreshed sooner than TOKEN_MIN_HOLD after `now`, so a token whose
+    lifetime is at or below TOKEN_REFRESH_MARGIN cannot cause a login loop.
+    """
+    claims = get_token_claims(access_token)
+    expiry = claims.get("exp")
+    if expiry is None:
+        return None
+    now = now or time.time()
+    lifetime = max(0, expiry - claims.get("iat", now))
+    margin = min(TOKEN_REFRESH_MARGIN, lifetime * TOKEN_REFRESH_FRACTION)
+    return max(expiry - margin, now + TOKEN_MIN_HOLD)
+
+
+class AuthManager:
+    """
+    Async login/negotiate client on one pooled aiohttp session.
+
+    The bearer token is cached until its `token_refresh_at` time; concurrent
+    callers that find it stale share one refresh.
+    """
+
+    def __init__(self):
+        self._session = None
+        self._token = None
+        self._refresh_at = None
+        self._lock = asyncio.Lock()
+
+    def _http(self):
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=HTTP_TIMEOUT))
+        return self._session
+
+    def _fresh(self) -> bool:
+        if not self._token:
+            return False
+        return self._refresh_at is None or time.time() < self._refresh_at
+
+    async def get_token(self, force: bool = False) -> str:
+        if not force and self._fresh():
+            return self._token
+        async with self._lock:
+            # Another caller may have refreshed while we waited for the lock
+            if not force and self._fresh():
+                return self._token
+            self._token = await self._login()
+            self._refresh_at = token_refresh_at(self._token)
+            return self._token
+
+    async def _login(self) -> str:
+        if not HUB_USER or not HUB_PASSWORD:
+            raise RuntimeError("HUB_USER and HUB_PASSWORD must be set to log in to the hub")
+        login_body = {
+            "loginType": HUB_LOGIN_TYPE,
+            "loginuser": HUB_USER,
+            "pass": HUB_PASSWORD,
+            "tenant": HUB_TENANT
+        }
+        async with self._http().post(LOGIN_URL, json=login_body) as res:
+            res.raise_for_status()
+            data = await res.json(content_type=None)
+
+        print("✔ Login Successful")
+        return "Bearer " + data["token"]
+
+    async def negotiate(self, access_token: str) -> str:
+        headers = {
+            "Authorization": access_token,
+            "Accept": "*/*",
+            "Content-Type": "text/plain;charset=UTF-8",
+            "X-Requested-With": "XMLHttpRequest",
+            "x-signalr-user-agent": "Microsoft SignalR/5.0 (5.0.17; Python)"
+        }
+        async with self._http().post(NEGOTIATE_URL, headers=headers, data="") as res:
+            res.raise_for_status()
+            data = await res.json(content_type=None)
+
+        print("✔ Negotiate Success")
+        return data["connectionToken"]
+
+    async def close(self):
+        if self._session and not self._session.closed:
+            await self._session.close()
+
+
+auth_manager = AuthManager()
+
+
+async def get_token():
+    return await auth_manager.get_token()
+
+
+async def negotiate_connection(access_token):
+    return await auth_manager.negotiate(access_token)
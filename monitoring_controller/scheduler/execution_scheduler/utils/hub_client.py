@@ -0,0 +1,184 @@
+import os
+import asyncio
+import logging
+import itertools
+import inspect
+import websockets
+from scheduler.execution_scheduler.utils.hub_codec import get_codec, INVOCATION, COMPLETION, CLOSE
+
+logger = logging.getLogger(__name__)
+
+HUB_URL = os.getenv("HUB_URL", "wss://us01governor.futuredge.com/api/myhub")
+HUB_INVOKE_TIMEOUT = float(os.getenv("HUB_INVOKE_TIMEOUT", 30))
+# Seconds between pings; well under the server's ClientTimeoutInterval (30s by default)
+HUB_KEEPALIVE_INTERVAL = float(os.getenv("HUB_KEEPALIVE_INTERVAL", 15))
+
+
+class HubError(Exception):
+    """The hub completed an invocation with an error."""
+
+
+class HubClient:
+    """
+    Request/response client over one SignalR hub socket.
+
+    `invoke(target, args, timeout=...)` returns the completion result,
+    matched by invocation ID, so any number of invocations can be in flight
+    on the same socket. Server-pushed targets are dispatched to handlers
+    registered with `on(target, handler)`; `expect(target)` returns a future
+    for the next push of a target. Handlers run on the reader, so they
+    should be quick (or only enqueue work). While the reader runs, a ping is
+    sent every HUB_KEEPALIVE_INTERVAL seconds so an idle socket is not
+    dropped by the server.
+    """
+
+    def __init__(self, codec=None, on_frame=None):
+        self.codec = codec or get_codec()
+        self.on_frame = on_frame
+        self.ws = None
+        self._closed = True
+        self._ids = itertools.count(1)
+        self._pending = {}
+        self._handlers = {}
+        self._waiters = {}
+        self._reader = None
+        self._keepalive = None
+        self._backlog = []
+
+    # ---------------------------
+    # Connection
+    # ---------------------------
+    async def connect(self, access_token: str, connection_token: str):
+        url = (
+            f"{HUB_URL}?Machine=WebClient&Key=random&id={connection_token}"
+            f"&access_token={access_token.replace('Bearer ', '')}"
+        )
+        self.ws = await websockets.connect(url)
+        self._closed = False
+        await self.ws.send(self.codec.handshake())
+
+        # Wait for the handshake response; anything after it is dispatched by `run`
+        messages = list(self.codec.decode(await self.ws.recv()))
+        handshake = messages[0] if messages else {}
+        if handshake.get("error"):
+            raise HubError(f"Handshake failed: {handshake['error']}")
+        self._backlog = messages[1:]
+        return self
+
+    def start(self):
+        """Run the reader in the background (for clients that do not call `run`)."""
+        self._reader = asyncio.create_task(self.run())
+        return self._reader
+
+    async def run(self):
+        """Read until the socket closes; pending invocations then fail."""
+        self._keepalive = asyncio.create_task(self._ping())
+        try:
+            for msg in self._backlog:
+                await self._dispatch(msg)
+            self._backlog = []
+            async for raw in self.ws:
+                if self.on_frame:
+                    self.on_frame()
+                try:
+                    for msg in self.codec.decode(raw):
+                        await self._dispatch(msg)
+                except Exception as e:
+                    logger.error(f"⚠ Error processing hub frame: {e}", exc_info=True)
+        finally:
+            self._closed = True
+            self._keepalive.cancel()
+            self._fail_pending(ConnectionError("Hub connection closed"))
+
+    async def _ping(self):
+        while not self._closed:
+            await asyncio.sleep(HUB_KEEPALIVE_INTERVAL)
+            try:
+                await self.ws.send(self.codec.encode_ping())
+            except Exception as e:
+                logger.warning(f"⚠ Hub keep-alive ping failed: {e}")
+                return
+
+    async def close(self):
+        self._closed = True
+        if self._keepalive:
+            self._keepalive.cancel()
+        if self._reader:
+            self._reader.cancel()
+        if self.ws:
+            await self.ws.close()
+        self._fail_pending(ConnectionError("Hub connection closed"))
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    # ---------------------------
+    # Messaging
+    # ---------------------------
+    def on(self, target: str, handler):
+        """Register `handler(arguments)` (sync or async) for a server-pushed target."""
+        self._handlers[target.lower()] = handler
+
+    def expect(self, target: str):
+        """Future resolved with the arguments of the next push of `target`."""
+        fut = asyncio.get_running_loop().create_future()
+        self._waiters.setdefault(target.lower(), []).append(fut)
+        return fut
+
+    async def send(self, target: str, args):
+        """Send an invocation without waiting for its completion."""
+        await self.ws.send(self.codec.encode_invocation(target, self._next_id(), args))
+
+    async def invoke(self, target: str, args, timeout: float = HUB_INVOKE_TIMEOUT):
+        """Invoke a hub method and return its result; raises HubError or asyncio.TimeoutError."""
+        invocation_id = self._next_id()
+        fut = asyncio.get_running_loop().create_future()
+        self._pending[invocation_id] = fut
+        try:
+            await self.ws.send(self.codec.encode_invocation(target, invocation_id, args))
+            return await asyncio.wait_for(fut, timeout)
+        finally:
+            self._pending.pop(invocation_id, None)
+
+    def _next_id(self) -> str:
+        return str(next(self._ids))
+
+    async def _dispatch(self, msg):
+        kind = msg.get("type")
+        if kind == INVOCATION:
+            target = (msg.get("target") or "").lower()
+            args = msg.get("arguments") or []
+            for fut in self._waiters.pop(target, []):
+                if not fut.done():
+                    fut.set_result(args)
+            handler = self._handlers.get(target)
+            if handler:
+                result = handler(args)
+                if inspect.isawaitable(result):
+                    await result
+
+        elif kind == COMPLETION:
+            fut = self._pending.get(msg.get("invocationId"))
+            if fut and not fut.done():
+                if msg.get("error"):
+                    fut.set_exception(HubError(msg["error"]))
+                else:
+                    fut.set_result(msg.get("result"))
+
+        elif kind == CLOSE:
+            logger.warning(f"🔌 Hub sent close: {msg.get('error')}")
+            await self.ws.close()
+
+    def _fail_pending(self, exc):
+        for fut in list(self._pending.values()) + [f for fs in self._waiters.values() for f in fs]:
+            if not fut.done():
+                fut.set_exception(exc)
+        self._pending.clear()
+        self._waiters.clear()
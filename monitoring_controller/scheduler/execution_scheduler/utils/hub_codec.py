@@ -0,0 +1,169 @@
+import os
+import json
+
+# -------------------------------
+# SignalR hub protocols
+# -------------------------------
+# Both codecs decode into the JSON protocol's message shape, e.g.
+#   {"type": 1, "target": ..., "invocationId": ..., "arguments": [...]}
+#   {"type": 3, "invocationId": ..., "result": ..., "error": ...}
+# so callers do not need to know which protocol is on the wire.
+
+HUB_PROTOCOL = os.getenv("HUB_PROTOCOL", "json")
+RS = "\x1e"
+
+INVOCATION = 1
+STREAM_ITEM = 2
+COMPLETION = 3
+PING = 6
+CLOSE = 7
+
+
+class JsonHubCodec:
+    """SignalR JSON protocol: text frames of JSON records terminated by \\x1e."""
+
+    name = "json"
+
+    def __init__(self):
+        self._decoder = json.JSONDecoder()
+
+    def handshake(self):
+        return json.dumps({"protocol": "json", "version": 1}) + RS
+
+    def encode_invocation(self, target, invocation_id, args):
+        return json.dumps({
+            "type": INVOCATION,
+            "target": target,
+            "invocationId": str(invocation_id),
+            "arguments": args
+        }) + RS
+
+    def encode_ping(self):
+        return json.dumps({"type": PING}) + RS
+
+    def decode(self, raw):
+        """
+        Yield every message in a frame. Walks the frame with raw_decode
+        instead of building an intermediate list of split strings.
+        """
+        if isinstance(raw, bytes):
+            raw = raw.decode("utf-8")
+        decode = self._decoder.raw_decode
+        pos, end = 0, len(raw)
+        while pos < end:
+            if raw[pos] in " \r\n\t\x1e":
+                pos += 1
+                continue
+            msg, pos = decode(raw, pos)
+            yield msg
+
+
+class MessagePackHubCodec:
+    """
+    SignalR MessagePack protocol: binary frames of varint length-prefixed
+    msgpack arrays. The handshake itself is still JSON, as the spec requires.
+    DateTime values are decoded to timezone-aware datetimes.
+    """
+
+    name = "messagepack"
+
+    def __init__(self):
+        import msgpack
+        self._msgpack = msgpack
+        self._handshake_done = False
+
+    def handshake(self):
+        self._handshake_done = False
+        return (json.dumps({"protocol": "messagepack", "version": 1}) + RS).encode("utf-8")
+
+    def encode_invocation(self, target, invocation_id, args):
+        body = self._msgpack.packb(
+            [INVOCATION, {}, str(invocation_id), target, args, []],
+            use_bin_type=True,
+        )
+        return _write_varint(len(body)) + body
+
+    def encode_ping(self):
+        body = self._msgpack.packb([PING])
+        return _write_varint(len(body)) + body
+
+    def decode(self, raw):
+        if isinstance(raw, str):
+            raw = raw.encode("utf-8")
+        data = memoryview(raw)
+        pos, end = 0, len(data)
+
+        # The handshake response is a JSON record ahead of the first binary message
+        if not self._handshake_done:
+            sep = raw.find(b"\x1e")
+            if sep == -1:
+                return
+            yield json.loads(bytes(data[:sep]) or b"{}")
+            self._handshake_done = True
+            pos = sep + 1
+
+        unpackb = self._msgpack.unpackb
+        while pos < end:
+            length, pos = _read_varint(data, pos)
+            item = unpackb(data[pos:pos + length], raw=False, timestamp=3, strict_map_key=False)
+            pos += length
+            yield _to_message(item)
+
+
+def _write_varint(value):
+    out = bytearray()
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        if value:
+            out.append(byte | 0x80)
+        else:
+            out.append(byte)
+            return bytes(out)
+
+
+def _read_varint(data, pos):
+    value, shift = 0, 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return value, pos
+        shift += 7
+        if shift > 28:
+            raise ValueError("SignalR length prefix longer than 5 bytes")
+
+
+def _to_message(item):
+    """Map a msgpack message array onto the JSON protocol's dict shape."""
+    kind = item[0]
+    if kind == INVOCATION:
+        return {"type": kind, "invocationId": item[2], "target": item[3], "arguments": item[4]}
+    if kind == STREAM_ITEM:
+        return {"type": kind, "invocationId": item[2], "item": item[3]}
+    if kind == COMPLETION:
+        msg = {"type": kind, "invocationId": item[2]}
+        result_kind = item[3]
+        if result_kind == 1:
+            msg["error"] = item[4]
+        elif result_kind == 3:
+            msg["result"] = item[4]
+        return msg
+    if kind == CLOSE:
+        return {"type": kind, "error": item[1] if len(item) > 1 else None}
+    return {"type": kind}
+
+
+CODECS = {
+    "json": JsonHubCodec,
+    "messagepack": MessagePackHubCodec,
+}
+
+
+def get_codec(protocol: str = HUB_PROTOCOL):
+    """Return a fresh codec for `protocol` ("json" or "messagepack")."""
+    try:
+        return CODECS[protocol]()
+    except KeyError:
+        raise ValueError(f"Unsupported hub protocol: {protocol}")
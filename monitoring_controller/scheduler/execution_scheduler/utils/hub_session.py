@@ -0,0 +1,78 @@
+import os
+import asyncio
+import logging
+from scheduler.execution_scheduler.utils.apis import get_token, negotiate_connection
+from scheduler.execution_scheduler.utils.hub_client import HubClient
+from scheduler.execution_scheduler.utils.reconnect import Reconnector
+
+logger = logging.getLogger(__name__)
+
+SESSION_MAX_BACKOFF = float(os.getenv("HUB_SESSION_MAX_BACKOFF", 60))
+# How long a replaced socket stays open for invocations still running on it
+SESSION_RETIRE_GRACE = 60
+
+
+class HubSession:
+    """
+    A long-lived, authenticated HubClient kept warm in the background and
+    shared by every caller. Concurrent callers multiplex their invocations on
+    the one socket instead of each logging in and opening their own.
+    """
+
+    def __init__(self, name: str = "hub"):
+        self.name = name
+        self.client = None
+        self._ready = asyncio.Event()
+        self._reconnect = Reconnector(1.0, SESSION_MAX_BACKOFF)
+        self.stats = {"connects": 0, "failures": 0}
+
+    async def get(self, timeout: float = 30) -> HubClient:
+        """Return the connected client, waiting for a (re)connect if needed."""
+        if not self._ready.is_set():
+            await asyncio.wait_for(self._ready.wait(), timeout)
+        return self.client
+
+    async def run(self):
+        """Keep the session connected; reconnect on close and before token expiry."""
+        while True:
+            try:
+                client, reader = await self._connect()
+                old, self.client = self.client, client
+                self._ready.set()
+                self._reconnect.connected()
+                if old:
+                    # Let invocations already running on the old socket finish
+                    asyncio.create_task(self._retire(old))
+
+                if await self._hold(reader):
+                    continue  # token refresh: swap in a new socket without a gap
+                logger.warning(f"🔌 {self.name} session socket closed")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.stats["failures"] += 1
+                logger.error(f"⚠ {self.name} session error: {e}")
+
+            self._ready.clear()
+            await asyncio.sleep(self._reconnect.next_delay())
+
+    async def _connect(self):
+        access_token = await get_token()
+        connection_token = await negotiate_connection(access_token)
+        self._reconnect.token_acquired(access_token)
+
+        client = HubClient()
+        await client.connect(access_token, connection_token)
+        reader = client.start()
+        self.stats["connects"] += 1
+        logger.info(f"✔ {self.name} session connected")
+        return client, reader
+
+    async def _hold(self, reader) -> bool:
+        """Wait until the socket closes (False) or the token is due for refresh (True)."""
+        done, _ = await asyncio.wait({reader}, timeout=self._reconnect.until_refresh())
+        return not done
+
+    async def _retire(self, client):
+        await asyncio.sleep(SESSION_RETIRE_GRACE)
+        await client.close()
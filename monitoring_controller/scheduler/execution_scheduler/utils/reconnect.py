@@ -0,0 +1,41 @@
+import time
+import random
+from scheduler.execution_scheduler.utils.apis import get_token_expiry, token_refresh_at
+
+
+class Reconnector:
+    """
+    Token refresh deadline and jittered exponential backoff for one long-lived
+    hub connection. HubSupervisor and HubSession both use it, so every hub
+    socket is recycled and retried the same way.
+    """
+
+    def __init__(self, base_delay: float, max_delay: float):
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.attempt = 0
+        self.token_expiry = None
+        self.refresh_at = None
+
+    def token_acquired(self, access_token):
+        """Record the token a new socket is opened with."""
+        self.token_expiry = get_token_expiry(access_token)
+        self.refresh_at = token_refresh_at(access_token)
+
+    def connected(self):
+        self.attempt = 0
+
+    def until_refresh(self):
+        """Seconds until the socket should be recycled for a new token; None if never."""
+        if self.refresh_at is None:
+            return None
+        return max(0.0, self.refresh_at - time.time())
+
+    def refresh_due(self) -> bool:
+        return self.refresh_at is not None and time.time() >= self.refresh_at
+
+    def next_delay(self) -> float:
+        """Backoff before the next attempt; grows until `connected` resets it."""
+        delay = min(self.max_delay, self.base_delay * 2 ** self.attempt) * random.uniform(0.5, 1.0)
+        self.attempt += 1
+        return delay
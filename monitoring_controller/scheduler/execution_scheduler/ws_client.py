@@ -1,32 +1,26 @@
-import json
+import os
 import asyncio
-from datetime import datetime
-import websockets
-from db_connection.database import db
-
-all_exec = None
-all_logs = None
-EXT = "\x1e"
-
-def make_invocation(target, invocation_id, args):
-    return json.dumps({
-        "type": 1,
-        "target": target,
-        "invocationId": str(invocation_id),
-        "arguments": args
-    }) + EXT
+from datetime import datetime, timezone
+from scheduler.execution_scheduler.ingest_writer import execution_writer, log_writer
+from scheduler.execution_scheduler.log_watermarks import log_watermarks
+from scheduler.execution_scheduler.ingest_queue import ingest_pipeline
+from scheduler.execution_scheduler.execution_cache import execution_cache
+from scheduler.execution_scheduler.execution_poller import execution_poller
+from scheduler.execution_scheduler.backfill import log_backfill
+from scheduler.execution_scheduler.utils.hub_client import HubClient, HubError
+
+LOG_PAGE_SIZE = int(os.getenv("LOG_PAGE_SIZE", 50))
+EXECUTION_POLL_INTERVAL = float(os.getenv("EXECUTION_POLL_INTERVAL", 30))
 
 # -------------------------------
 # Save executions into MongoDB
 # -------------------------------
 async def save_executions_to_db(df_exec):
-    print("save_executions_to_db :")
-    for exec_dict in df_exec:
-        await db.executions.update_one(
-            {"ExecutionId": exec_dict["ExecutionId"]},
-            {"$set": exec_dict},
-            upsert=True
-        )
+    # Skip executions that are unchanged since they were last written
+    changed = execution_cache.filter_changed(df_exec)
+    print(f"save_executions_to_db : {len(changed)} changed of {len(df_exec)}")
+    if changed:
+        await execution_writer.add(changed)
 
 # -------------------------------
 # Save logs into MongoDB
@@ -35,88 +29,120 @@ async def save_logs_to_db(df_log):
     print("save_logs_to_db :")
     if not isinstance(df_log, list):
         df_log = df_log.to_dict('records')
-    for log_dict in df_log:
-        await db.logs.update_one(
-            {"logid": log_dict["logid"]},
-            {"$set": log_dict},
-            upsert=True
-        )
+    await log_writer.add(df_log)
 
 # -------------------------------
 # WebSocket client
 # -------------------------------
-async def run_ws_client(access_token: str, connection_token: str):
+async def run_ws_client(access_token: str, connection_token: str, on_connected=None, on_frame=None):
 
-    websocket_url = (
-        "wss://us01governor.futuredge.com/api/myhub"
-        f"?Machine=WebClient&Key=random&id={connection_token}"
-        f"&access_token={access_token.replace('Bearer ', '')}"
-    )
+    async with HubClient(on_frame=on_frame) as hub:
+        await hub.connect(access_token, connection_token)
+        print(f"✔ Connected to WebSocket: {datetime.now()} (protocol={hub.codec.name})")
+        if on_connected:
+            on_connected()
 
-    async with websockets.connect(websocket_url) as ws:
-        print(f"✔ Connected to WebSocket: {datetime.now()}")
+        def shutting_down():
+            return ingest_pipeline.stopping or hub.closed
 
-        # SignalR handshake
-        await ws.send(json.dumps({"protocol": "json", "version": 1}) + EXT)
-        await asyncio.sleep(0.1)
+        async def fetch_execution_page(page, page_size):
+            await ingest_pipeline.wait_for_capacity()
+            if shutting_down():
+                return
+            await hub.send("ViewExecution", [page, page_size, None])
 
         async def fetch_executions():
-            await ws.send(make_invocation("ViewExecution", "1", [0, 3, None]))
+            await log_backfill.on_poll()
+            await execution_poller.poll(fetch_execution_page)
             print("📤 Requested executions")
 
+        async def fetch_log_page(exc_id, page, chain):
+            await ingest_pipeline.wait_for_capacity()
+            if shutting_down():
+                return  # left to the next connection, which restarts from the mark
+            if log_watermarks.chain(exc_id) != chain:
+                return  # superseded by a restarted catch-up
+            # Hub log times are UTC, and so are the backfill's day windows
+            now = datetime.now(timezone.utc)
+            try:
+                await hub.invoke("ViewLogExecution", [exc_id, page, LOG_PAGE_SIZE, now.day, now.month, now.year, ""])
+            except (asyncio.TimeoutError, HubError, ConnectionError) as e:
+                # Left to the next poll, which restarts a stalled catch-up from the mark
+                print(f"⚠ Log page {page} for {exc_id} failed: {e}")
+                return
+            # The pushed page was queued before its completion, so this marker is handled after it
+            await ingest_pipeline.put("logpage", (exc_id, page, chain))
+
         async def fetch_logs(execution_ids):
+            execution_ids = await log_watermarks.before_poll(execution_ids)
             for exc_id in execution_ids:
-                await ws.send(make_invocation(
-                    "ViewLogExecution",
-                    str(datetime.now().timestamp()).replace('.', ''),  # unique ID
-                    [exc_id, 0, 50, datetime.now().day, datetime.now().month, datetime.now().year, ""]
-                ))
+                asyncio.create_task(fetch_log_page(exc_id, 0, log_watermarks.chain(exc_id)))
             print("📤 Requested logs for executions:", execution_ids)
-            
-        
+
+        async def handle_logs(data):
+            new_rows = log_watermarks.filter_new(data)
+            print(f"📝 Logs received: {len(data)} ({len(new_rows)} new)")
+            if new_rows:
+                await save_logs_to_db(new_rows)
+
+        async def handle_log_page(exc_id, page, chain):
+            received, new = log_watermarks.take_page(exc_id)
+            if log_watermarks.chain(exc_id) != chain:
+                return
+            if page == 0:
+                log_watermarks.responded(exc_id, new)
+            # A full page of new rows means there may be more past the watermark.
+            # Not awaited: a writer must never block on queue capacity itself.
+            if received >= LOG_PAGE_SIZE and new == received:
+                asyncio.create_task(fetch_log_page(exc_id, page + 1, chain))
+            else:
+                await log_watermarks.end_catchup(exc_id)
+
+        # Writer pool: everything below runs off the receive loop
+        async def handle_payload(target, data):
+            # Executions
+            if target == "viewexecution":
+                print(f"📌 Executions received: {len(data)}")
+                await save_executions_to_db(data)
+
+                # Next pages are requested off the writer so it never waits on queue capacity
+                asyncio.create_task(execution_poller.on_page(data))
+
+                # Fetch logs for executions that are not drained yet
+                log_watermarks.observe_executions(data)
+                execution_ids = [e["ExecutionId"] for e in data]
+                asyncio.create_task(fetch_logs(execution_ids))
+
+            # Logs
+            elif target == "viewlogexecution":
+                await handle_logs(data)
+
+            # A log page request completed
+            elif target == "logpage":
+                await handle_log_page(*data)
+
+        # Receiver: the hub reader only enqueues pushed payloads
+        hub.on("viewExecution", lambda args: ingest_pipeline.put("viewexecution", args[0]["Data"]))
+        hub.on("viewLogExecution", lambda args: ingest_pipeline.put("viewlogexecution", args[0]["Data"]))
+        ingest_pipeline.start(handle_payload)
+        reader = hub.start()
 
         # Run first fetch immediately
         await fetch_executions()
 
-        # Schedule periodic fetch every 10 minutes
-        asyncio.create_task(periodic_fetch(ws, fetch_executions, interval=30))
-
-        global all_exec, all_logs
-        while True:
-            raw = await ws.recv()
-            frames = [f for f in raw.split(EXT) if f.strip()]
-
-            for frame in frames:
-                try:
-                    msg = json.loads(frame)
-                    if msg.get("type") == 6:  # ping
-                        continue
-
-                    target = msg.get("target", "").lower()
-
-                    # Executions
-                    if msg.get("type") == 1 and target == "viewexecution":
-                        data = msg["arguments"][0]["Data"]
-                        print(f"📌 Executions received: {len(data)}")
-                        await save_executions_to_db(data)
-
-                        # Fetch logs for all executions
-                        execution_ids = [e["ExecutionId"] for e in data]
-                        asyncio.create_task(fetch_logs(execution_ids))
-
-                    # Logs
-                    elif msg.get("type") == 1 and target == "viewlogexecution":
-                        data = msg["arguments"][0]["Data"]
-                        print(f"📝 Logs received: {len(data)}")
-                        await save_logs_to_db(data)
+        # Schedule periodic fetch (every 30 seconds by default)
+        fetch_task = asyncio.create_task(periodic_fetch(fetch_executions, interval=EXECUTION_POLL_INTERVAL))
 
-                except Exception as e:
-                    print("⚠ Error processing frame:", e, frame)
+        try:
+            await reader
+        finally:
+            fetch_task.cancel()
+            await ingest_pipeline.stop()
 
 # -------------------------------
 # Periodic fetch task
 # -------------------------------
-async def periodic_fetch(ws, fetch_func, interval=30):
+async def periodic_fetch(fetch_func, interval=30):
     while True:
         await asyncio.sleep(interval)
         await fetch_func()
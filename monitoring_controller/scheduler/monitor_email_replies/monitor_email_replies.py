@@ -5,6 +5,7 @@ from email.header import decode_header
 from datetime import datetime, timezone
 import re
 from db_connection.database import db
+from scheduler.db_scheduler.monitor_faulted_executions import process_faulted_executions
 
 
 # -------------------------------------------------------------
@@ -143,12 +144,18 @@ async def process_email_replies():
                 "$set": {
                     "status":"Processing",
                     "mailrecived_text": body,
+                    # A reply is new input, so a dead-lettered job gets another try
+                    "dead_lettered": False,
                     "UpdatedAt": datetime.now(timezone.utc),
                 }
             }
         )
         logging.info(f"📨 Updated job {job['_id']} using email reply.")
 
+        # Re-run the job now instead of waiting for the next reconciliation sweep
+        if job.get("ExecutionId"):
+            await process_faulted_executions([job["ExecutionId"]])
+
 
 # -------------------------------------------------------------
 #  SCHEDULER LOOP WITH LOGS
@@ -8,6 +8,8 @@ class Job(BaseModel):
     threadId: Optional[str] = None
     is_mailsent: bool = False
     is_running: bool = False
+    lease_owner: Optional[str] = None
+    lease_expires: Optional[datetime] = None
     mailsent_text: Optional[str] = None
     mailrecived_text: Optional[str] = None
     status: Optional[str] = None
@@ -25,4 +27,8 @@ class JobUpdate(BaseModel):
     mailsent_text: Optional[str] = None
     mailrecived_text: Optional[str] = None
     status: Optional[str] = None
-    
+
+
+class JobBulkUpdateItem(BaseModel):
+    id: str
+    update: JobUpdate
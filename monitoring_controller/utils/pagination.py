@@ -0,0 +1,119 @@
+import base64
+from datetime import datetime
+from bson import ObjectId, json_util
+from fastapi import HTTPException
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+
+# ---------------------------
+# Cursors
+# ---------------------------
+def encode_cursor(doc, sort_field: str) -> str:
+    """Opaque cursor for the position right after `doc`."""
+    raw = json_util.dumps({"v": doc.get(sort_field), "id": doc["_id"]})
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> dict:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        position = json_util.loads(raw)
+        return {"v": position["v"], "id": position["id"]}
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+# ---------------------------
+# Query helpers
+# ---------------------------
+def parse_fields(fields: str, required=("_id",), aliases=None) -> dict:
+    """`fields=a,b,c` -> Mongo projection; None returns whole documents."""
+    if not fields:
+        return None
+    aliases = aliases or {}
+    names = [f.strip() for f in fields.split(",") if f.strip()]
+    projection = {aliases.get(name, name): 1 for name in names}
+    for name in required:
+        projection[name] = 1
+    return projection
+
+
+def time_range(field: str, since: datetime = None, until: datetime = None, as_string: bool = False) -> dict:
+    """{field: {$gte, $lt}} for the given bounds; ISO strings when the field stores text."""
+    bounds = {}
+    if since:
+        bounds["$gte"] = since.isoformat() if as_string else since
+    if until:
+        bounds["$lt"] = until.isoformat() if as_string else until
+    return {field: bounds} if bounds else {}
+
+
+def to_json(value):
+    """`json.dumps` default: ISO datetimes, anything else (ObjectId, Decimal128) as a string."""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+def convert_ids(doc):
+    """Stringify every ObjectId in a document so it serialises as JSON."""
+    for key, value in doc.items():
+        if isinstance(value, ObjectId):
+            doc[key] = str(value)
+    return doc
+
+
+def keyset_query(query: dict, sort_field: str, descending: bool, cursor: str = None, tiebreak: bool = True):
+    """(filter, sort) for the page starting right after `cursor` in (sort_field, _id) order."""
+    direction = -1 if descending else 1
+    op = "$lt" if descending else "$gt"
+
+    filters = [query] if query else []
+    if cursor:
+        position = decode_cursor(cursor)
+        if sort_field == "_id":
+            filters.append({"_id": {op: position["id"]}})
+        elif not tiebreak:
+            filters.append({sort_field: {op: position["v"]}})
+        else:
+            filters.append({"$or": [
+                {sort_field: {op: position["v"]}},
+                {sort_field: position["v"], "_id": {op: position["id"]}},
+            ]})
+    mongo_query = {"$and": filters} if len(filters) > 1 else (filters[0] if filters else {})
+
+    sort = [(sort_field, direction)]
+    if tiebreak and sort_field != "_id":
+        sort.append(("_id", direction))
+    return mongo_query, sort
+
+
+def page_result(docs: list, limit: int, sort_field: str, transform=None) -> dict:
+    """Trim the limit+1 fetched documents to a page and its next cursor."""
+    next_cursor = None
+    if len(docs) > limit:
+        docs = docs[:limit]
+        next_cursor = encode_cursor(docs[-1], sort_field)
+    items = [convert_ids(transform(d) if transform else d) for d in docs]
+    return {"items": items, "next_cursor": next_cursor, "limit": limit}
+
+
+async def paginate(collection, query: dict, sort_field: str = "_id", descending: bool = True,
+                   limit: int = DEFAULT_PAGE_SIZE, cursor: str = None, projection: dict = None,
+                   transform=None, tiebreak: bool = True) -> dict:
+    """
+    One keyset page of `collection`, ordered by (sort_field, _id), or by
+    sort_field alone when it is unique (tiebreak=False).
+
+    Each page is a range scan that starts right after the previous page's last
+    document, so its cost does not grow with the page number. Returns
+    {"items", "next_cursor", "limit"}; next_cursor is None on the last page.
+    """
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    mongo_query, sort = keyset_query(query, sort_field, descending, cursor, tiebreak)
+    if projection is not None:
+        projection = {**projection, sort_field: 1, "_id": 1}
+    docs = await collection.find(mongo_query, projection).sort(sort).limit(limit + 1).to_list(limit + 1)
+    return page_result(docs, limit, sort_field, transform)
@@ -0,0 +1,138 @@
+import os
+import time
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+CATALOG_TTL = float(os.getenv("CATALOG_TTL", 300))
+CATALOG_TIMEOUT = 30
+ROBOT_PAGE_SIZE = 50
+
+
+class ProcessCatalog:
+    """
+    TTL cache of the hub's process and robot catalog for the restart flow.
+
+    Holds dict indexes for process name -> process, process Id -> entry files
+    and (process Id, robot name) -> robot object. Processes are refreshed in
+    the background every CATALOG_TTL seconds; robots and entry files are
+    loaded per process on first use and when they expire. A lookup miss
+    invalidates the entry and reloads once before giving up.
+
+    Loads are single-flight: callers that found the same stale or missing
+    entry wait for one download instead of each queueing their own.
+    """
+
+    def __init__(self, session, ttl: float = CATALOG_TTL):
+        self.session = session
+        self.ttl = ttl
+        self._processes = {}
+        self._processes_at = 0.0
+        self._entry_files = {}
+        self._robots = {}
+        self._robots_at = {}
+        self._process_lock = asyncio.Lock()
+        self._detail_locks = {}
+        # viewRobot pushes carry no invocation ID, so only one robot listing runs at a time
+        self._robot_lock = asyncio.Lock()
+        self.stats = {"hits": 0, "misses": 0, "refreshes": 0}
+
+    # ---------------------------
+    # Lookups
+    # ---------------------------
+    async def process_id(self, name: str):
+        if time.monotonic() - self._processes_at > self.ttl:
+            await self.refresh_processes(after=self._processes_at)
+        process = self._processes.get(name)
+        if process is None:
+            self.stats["misses"] += 1
+            await self.refresh_processes(after=self._processes_at)
+            process = self._processes.get(name)
+        else:
+            self.stats["hits"] += 1
+        return process["Id"] if process else None
+
+    async def entry_files(self, process_id):
+        await self._ensure_process_details(process_id)
+        return self._entry_files.get(process_id, [])
+
+    async def robot(self, process_id, robot_name: str):
+        await self._ensure_process_details(process_id)
+        robot = self._robots.get((process_id, robot_name))
+        if robot is None:
+            self.stats["misses"] += 1
+            await self._load_process_details(process_id, after=self._robots_at.get(process_id, 0.0))
+            robot = self._robots.get((process_id, robot_name))
+        else:
+            self.stats["hits"] += 1
+        return robot
+
+    def invalidate(self, process_id=None):
+        """Forget robots/entry files for one process (or everything)."""
+        if process_id is None:
+            self._processes_at = 0.0
+            self._robots_at.clear()
+        else:
+            self._robots_at.pop(process_id, None)
+
+    # ---------------------------
+    # Loading
+    # ---------------------------
+    async def refresh_processes(self, after: float = None):
+        """Reload the process list, unless another caller already did since `after`."""
+        async with self._process_lock:
+            if after is not None and self._processes_at > after:
+                return
+            hub = await self.session.get()
+            result_list = await hub.invoke("ViewNoPageProcess", [], timeout=CATALOG_TIMEOUT) or []
+            self._processes = {p["Name"]: p for p in result_list}
+            self._processes_at = time.monotonic()
+            self.stats["refreshes"] += 1
+            logger.info(f"📚 Process catalog refreshed: {len(self._processes)} processes")
+
+    async def _ensure_process_details(self, process_id):
+        if time.monotonic() - self._robots_at.get(process_id, 0.0) > self.ttl:
+            await self._load_process_details(process_id, after=self._robots_at.get(process_id, 0.0))
+
+    async def _load_process_details(self, process_id, after: float = None):
+        """Reload one process's robots and entry files, unless another caller already did since `after`."""
+        async with self._detail_locks.setdefault(process_id, asyncio.Lock()):
+            if after is not None and self._robots_at.get(process_id, 0.0) > after:
+                return
+            hub = await self.session.get()
+            files_result, robots = await asyncio.gather(
+                hub.invoke("ViewNoPageXamlPackageVersion", [process_id, False], timeout=CATALOG_TIMEOUT),
+                self._list_robots(hub, process_id),
+            )
+            self._entry_files[process_id] = [f["Name"] for f in (files_result or {}).get("listOfFiles", [])]
+            for key in [k for k in self._robots if k[0] == process_id]:
+                del self._robots[key]
+            for r in robots:
+                self._robots[(process_id, r["RobotName"])] = r
+            self._robots_at[process_id] = time.monotonic()
+
+    async def _list_robots(self, hub, process_id):
+        """Walk every ViewRobot page, not just the first 10 robots."""
+        robots, page = [], 0
+        async with self._robot_lock:
+            while True:
+                pushed = hub.expect("viewRobot")
+                await hub.invoke("ViewRobot", [page, ROBOT_PAGE_SIZE, None, process_id], timeout=CATALOG_TIMEOUT)
+                args = await asyncio.wait_for(pushed, CATALOG_TIMEOUT)
+                data = args[0]["Data"] if args and "Data" in args[0] else []
+                robots.extend(data)
+                if len(data) < ROBOT_PAGE_SIZE:
+                    return robots
+                page += 1
+
+    async def run(self):
+        """Background refresh so restarts rarely wait on a catalog load."""
+        while True:
+            try:
+                await self.refresh_processes()
+                for process_id in list(self._robots_at):
+                    await self._load_process_details(process_id)
+            except Exception as e:
+                logger.error(f"⚠ Process catalog refresh failed: {e}")
+            await asyncio.sleep(self.ttl)